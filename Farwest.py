@@ -1,15 +1,40 @@
 import fitz
 import re
 import os
-from openpyxl import Workbook
-from tkinter import Tk, filedialog
+from collections import namedtuple
 
+import batch_export
+from batch_export import (
+    ExportCancelled, XlsxRowWriter, close_pdf, export_pdfs,
+    find_named_folders, list_pdfs, open_pool,
+)
+
+
+# ============================================================
+#  PRE-COMPILED PATTERNS
+# ============================================================
+# A line is a plain number, a MM/DD/YYYY date, or anything else
+_TOKEN_RE = re.compile(
+    r"(?P<num>\d+(?:\.\d+)?)"
+    r"|(?P<date>\d{1,2}/\d{1,2}/\d{4})"
+)
+_OTHER, _NUM, _DATE = 0, 1, 2
+
+# One Farwest load; field order matches the export columns
+LineItem = namedtuple(
+    "LineItem",
+    "job_name invoice_number date description "
+    "quantity_tons unit_price extended_price",
+)
 
 # ============================================================
 #  TEXT EXTRACTION
 # ============================================================
-def extract_pdf_text(pdf_path):
-    """Return all readable text from a text-based PDF."""
+def iter_pdf_lines(pdf_path):
+    """
+    Yield the stripped, non-empty text lines of a text-based PDF,
+    one page at a time. The document is closed when iteration ends.
+    """
     pdf_path = os.path.normpath(pdf_path)
 
     try:
@@ -17,48 +42,76 @@ def extract_pdf_text(pdf_path):
     except Exception as e:
         raise RuntimeError(f"Cannot open PDF (corrupted or unreadable): {e}")
 
-    all_text = []
-    for page in doc:
-        try:
-            text = page.get_text("text")
-            all_text.append(text)
-        except:
-            pass
+    try:
+        for pno in range(doc.page_count):
+            page_lines = []
+            try:
+                page = doc.load_page(pno)
+                for block in page.get_text("blocks", flags=fitz.TEXTFLAGS_TEXT):
+                    if block[6] != 0:  # image block
+                        continue
+                    for ln in block[4].splitlines():
+                        ln = ln.strip()
+                        if ln:
+                            page_lines.append(ln)
+            except:
+                pass
+
+            yield from page_lines
+    finally:
+        close_pdf(doc)
+
 
-    return "\n".join(all_text)
+def extract_pdf_text(pdf_path):
+    """Return the stripped, non-empty text lines of a text-based PDF."""
+    return list(iter_pdf_lines(pdf_path))
 
 
 # ============================================================
 #  FARWEST FIELD EXTRACTION
 # ============================================================
-def extract_invoice_number(text):
+def extract_header_fields(lines):
     """
-    Invoice # is always on a line immediately following 'Invoice #'
+    Return (invoice_number, job_name) in a single pass over the lines.
+      - Invoice # is always on a line immediately following 'Invoice #'
+      - Job name appears immediately after the line 'JOB'
+    Either value is None when its label isn't found.
     """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    invoice_number = None
+    job_name = None
+    last = len(lines) - 1
+
     for i, ln in enumerate(lines):
-        if ln.lower() == "invoice #":
-            if i + 1 < len(lines):
-                return lines[i + 1].replace("#", "").strip()
-    return None
+        if i == last:
+            break
 
+        # labels match in any case; the length check keeps .lower() off
+        # every line that can't be one
+        if invoice_number is None and len(ln) == 9 and ln.lower() == "invoice #":
+            invoice_number = lines[i + 1].replace("#", "").strip()
+        elif job_name is None and len(ln) == 3 and ln.lower() == "job":
+            job_name = lines[i + 1]
 
-def extract_job_name(text):
-    """
-    Job name appears immediately after the line 'JOB'
-    """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    for i, ln in enumerate(lines):
-        if ln.lower() == "job":
-            if i + 1 < len(lines):
-                return lines[i + 1].strip()
-    return None
+        if invoice_number is not None and job_name is not None:
+            break
+
+    return invoice_number, job_name
 
 
 # ============================================================
 #  ITEM EXTRACTION (FARWEST)
 # ============================================================
-def extract_line_items(text, job_name, invoice_number):
+def _classify(line):
+    """Return _NUM, _DATE or _OTHER for one text line."""
+    # cheap first-char check before the regex
+    if line[0].isdigit():
+        m = _TOKEN_RE.fullmatch(line)
+        if m:
+            return _NUM if m.lastgroup == "num" else _DATE
+    return _OTHER
+
+
+def extract_line_items(lines, job_name, invoice_number):
     """
     Farwest format looks like:
 
@@ -74,51 +127,36 @@ def extract_line_items(text, job_name, invoice_number):
         description
         unit price
     """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    # First pass: tag every line once so the window below only
+    # compares small ints instead of re-running regexes.
+    tokens = [_classify(line) for line in lines]
+    n = len(lines)
 
     items = []
     i = 0
 
-    while i < len(lines):
-        line = lines[i]
-
-        # Quantity tons (float)
-        if re.fullmatch(r"\d+(\.\d+)?", line):
-            qty = float(line)
-
-            # Extended amount
-            if i + 1 < len(lines) and re.fullmatch(r"\d+(\.\d+)?", lines[i + 1]):
-                extended = float(lines[i + 1])
-            else:
-                i += 1
-                continue
-
-            # Date (MM/DD/YYYY style)
-            if i + 2 < len(lines) and re.fullmatch(r"\d{1,2}/\d{1,2}/\d{4}", lines[i + 2]):
-                date = lines[i + 2]
-            else:
-                i += 1
-                continue
-
+    while i < n - 2:
+        # quantity, extended amount, date
+        if tokens[i] == _NUM and tokens[i + 1] == _NUM and tokens[i + 2] == _DATE:
             # Description (string)
-            description = lines[i + 3] if (i + 3 < len(lines)) else ""
+            description = lines[i + 3] if (i + 3 < n) else ""
 
             # Unit Price
-            if i + 4 < len(lines) and re.fullmatch(r"\d+(\.\d+)?", lines[i + 4]):
+            if i + 4 < n and tokens[i + 4] == _NUM:
                 unit_price = float(lines[i + 4])
             else:
                 unit_price = 0.0
 
             # Build record
-            items.append({
-                "job_name": job_name,
-                "invoice_number": invoice_number,
-                "date": date,
-                "description": description,
-                "quantity_tons": qty,
-                "unit_price": unit_price,
-                "extended_price": extended
-            })
+            items.append(LineItem(
+                job_name,
+                invoice_number,
+                lines[i + 2],
+                description,
+                float(lines[i]),
+                unit_price,
+                float(lines[i + 1])
+            ))
 
             # Move pointer
             i += 5
@@ -132,116 +170,105 @@ def extract_line_items(text, job_name, invoice_number):
 # ============================================================
 #  BATCH PROCESSING
 # ============================================================
-def batch_process_folder():
+def _process_one_pdf(pdf):
     """
-    Find all subfolders named after this script and process all PDFs.
-    Example: script name = Farwest.py → looks for folders named 'Farwest'
+    Parse one Farwest PDF (runs in a worker process).
+    Returns (pdf, items, note, unreadable) for batch_export.export_pdfs,
+    so one bad file can't stop the batch.
     """
+    try:
+        lines = extract_pdf_text(pdf)
 
-    SCRIPT_NAME = os.path.splitext(os.path.basename(__file__))[0].strip()
+        invoice_number, job_name = extract_header_fields(lines)
+        items = extract_line_items(lines, job_name, invoice_number)
+    except Exception as e:
+        return pdf, [], f"   ⚠ Skipping unreadable file: {e}", True
+
+    if not items:
+        return pdf, [], "   ⚠ No line items found in this invoice.", False
 
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
+    return pdf, items, None, False
 
-    top_folder = filedialog.askdirectory(title=f"Select top folder (contains subfolders with '{SCRIPT_NAME}')")
-    if not top_folder:
-        print("Batch cancelled.")
-        return None
 
-    matched_folders = []
+# Folders named after this script hold its PDFs, e.g. Farwest.py → 'Farwest'
+SCRIPT_NAME = os.path.splitext(os.path.basename(__file__))[0].strip()
 
-    for root_dir, dirs, files in os.walk(top_folder):
-        for d in dirs:
-            if d.lower() == SCRIPT_NAME.lower():
-                matched_folders.append(os.path.join(root_dir, d))
+
+def process_folders(top_folder, save_path):
+    """
+    Find all subfolders of top_folder named after this script and
+    process all PDFs inside them. No dialogs, so this also runs headless.
+
+    Line items are written to save_path as each PDF finishes,
+    so memory stays flat no matter how many invoices are in the batch.
+    save_path may be a callable (e.g. batch_export.ask_save_path); it is
+    only called once there is a line item to write.
+    Returns the number of line items exported.
+    """
+    matched_folders = find_named_folders(top_folder, SCRIPT_NAME)
 
     if not matched_folders:
         print(f"\nNo folders named '{SCRIPT_NAME}' found under:\n{top_folder}")
-        return None
+        return 0
 
     print("\nFound matching folders:")
     for f in matched_folders:
         print(" -", f)
 
-    all_items = []
-
+    pdfs = []
     for folder in matched_folders:
-        pdfs = [
-            os.path.join(folder, f)
-            for f in os.listdir(folder)
-            if f.lower().endswith(".pdf")
-        ]
-
-        for pdf in pdfs:
-            print(f"\nProcessing: {os.path.basename(pdf)}")
-            text = extract_pdf_text(pdf)
-
-            invoice_number = extract_invoice_number(text)
-            job_name = extract_job_name(text)
-            items = extract_line_items(text, job_name, invoice_number)
-
-            if items:
-                all_items.extend(items)
-            else:
-                print("   ⚠ No line items found in this invoice.")
+        pdfs.extend(list_pdfs(folder))
 
-    print(f"\nExtracted line items: {len(all_items)}")
-    return all_items
+    writer = XlsxRowWriter(save_path, "Farwest Loads", EXPORT_HEADER)
+    try:
+        with open_pool() as pool:
+            export_pdfs(pool, _process_one_pdf, pdfs, writer)
+    except ExportCancelled:
+        print("Export cancelled.")
+        return 0
+    finally:
+        writer.close()
 
+    print(f"\nExtracted line items: {writer.rows}")
 
-# ============================================================
-#  EXPORT TO EXCEL
-# ============================================================
-def export_batch_to_excel(all_items):
-    if not all_items:
+    if not writer.rows:
         print("Nothing to export.")
-        return
-
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
+        return 0
 
-    save_path = filedialog.asksaveasfilename(
-        defaultextension=".xlsx",
-        filetypes=[("Excel Files", "*.xlsx")],
-        title="Save Batch Results As"
-    )
-
-    if not save_path:
-        print("Export cancelled.")
-        return
+    print(f"\nSaved:\n{writer.save_path}")
+    return writer.rows
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Farwest Loads"
 
-    ws.append([
-        "Job Name", "Invoice Number", "Date",
-        "Description", "Quantity (Tons)",
-        "Unit Price", "Extended Price"
-    ])
+def batch_process_folder():
+    """
+    Ask for the top folder, then run process_folders(); the output
+    workbook is asked for once the first line item is found.
+    Example: script name = Farwest.py → looks for folders named 'Farwest'
+    """
+    return batch_export.batch_process_folder(SCRIPT_NAME, process_folders)
 
-    for it in all_items:
-        ws.append([
-            it["job_name"],
-            it["invoice_number"],
-            it["date"],
-            it["description"],
-            it["quantity_tons"],
-            it["unit_price"],
-            it["extended_price"]
-        ])
 
-    wb.save(save_path)
-    print(f"\nSaved:\n{save_path}")
+# ============================================================
+#  EXPORT TO EXCEL
+# ============================================================
+EXPORT_HEADER = [
+    "Job Name", "Invoice Number", "Date",
+    "Description", "Quantity (Tons)",
+    "Unit Price", "Extended Price"
+]
 
 
 # ============================================================
 #  MAIN
 # ============================================================
+def main(argv=None):
+    batch_export.main(
+        argv,
+        "Extract Farwest line items from PDFs into one Excel workbook.",
+        SCRIPT_NAME,
+        process_folders,
+    )
+
+
 if __name__ == "__main__":
-    print("Select the TOP folder (e.g., 2025)...")
-    items = batch_process_folder()
-    if items:
-        export_batch_to_excel(items)
+    main()
@@ -1,44 +1,96 @@
 import fitz
 import re
 import os
-from openpyxl import Workbook
-from tkinter import Tk, filedialog
+from collections import namedtuple
+
+import batch_export
+from batch_export import (
+    ExportCancelled, XlsxRowWriter, close_pdf, export_pdfs,
+    find_named_folders, list_pdfs, open_pool,
+)
+
+# ============================================================
+#  PRE-COMPILED PATTERNS
+# ============================================================
+_TRUCK_RE = re.compile(r"[A-Z]{3}\d")
+
+# One pass classifies a block line as truck / qty / ext / unit.
+# 'ext' is tried before 'unit' so 2-decimal amounts report as 'ext';
+# a unit price like 21.50 is therefore accepted as either kind.
+_CLASSIFY_RE = re.compile(
+    r"(?P<truck>[A-Z]{3}\d)"
+    r"|(?P<qty>\d+(?:\.\d+)?\s*(?i:TN))"
+    r"|(?P<ext>\d+\.\d{2})"
+    r"|(?P<unit>\d+(?:\.\d{1,4})?)"
+)
+
+# Header / footer words that disqualify a line from being part of a block
+_BAD_WORDS_RE = re.compile(
+    r"item|description|special|instructions"
+    r"|subtotal|total|sales|discount"
+    r"|taxable|nontaxable|kr-mtn|quantity",
+    re.IGNORECASE,
+)
+
+# One hauled load; field order matches the export columns
+LineItem = namedtuple(
+    "LineItem",
+    "job_name ticket description truck "
+    "quantity_tons unit_price extended_price",
+)
 
 # ============================================================
 #  TEXT EXTRACTION (with path fix)
 # ============================================================
-def extract_pdf_text(pdf_path):
-    """Return all readable text from a text-based PDF."""
+def open_pdf(pdf_path):
+    """Open a text-based PDF; the caller closes it."""
     pdf_path = os.path.normpath(pdf_path)
 
     try:
-        doc = fitz.open(pdf_path)
+        return fitz.open(pdf_path)
     except Exception as e:
         raise RuntimeError(f"Cannot open PDF (corrupted or unreadable): {e}")
 
-    all_text = []
-    for page in doc:
-        try:
-            text = page.get_text("text")
-            all_text.append(text)
-        except Exception as e:
-            print(f"   ERROR reading page: {e}")
 
-    return "\n".join(all_text)
+def page_lines(page):
+    """Return the stripped, non-empty text lines of one page."""
+    try:
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    except Exception as e:
+        print(f"   ERROR reading page: {e}")
+        return []
+
+    lines = []
+    for block in textpage.extractBLOCKS():
+        if block[6] != 0:  # image block
+            continue
+        for ln in block[4].splitlines():
+            ln = ln.strip()
+            if ln:
+                lines.append(ln)
+    return lines
+
+
+def iter_doc_lines(doc):
+    """
+    Yield the stripped, non-empty text lines of an open document,
+    one page at a time (only one page's TextPage is alive at once).
+    """
+    for page in doc:
+        yield from page_lines(page)
 
 
 # ============================================================
 #  JOB NAME EXTRACTION
 # ============================================================
-def extract_job_name_from_text(text):
+def extract_job_name_from_text(lines):
     """
     Extract the job name from a Knife River invoice.
     Job name = line immediately ABOVE the word 'ORIGINAL'.
     """
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-
     for i, line in enumerate(lines):
-        if line.lower() == "original":
+        # any case; the length check keeps .lower() off most lines
+        if len(line) == 8 and line.lower() == "original":
             if i > 0:
                 candidate = lines[i - 1]
                 if not candidate.isdigit() and len(candidate) > 1:
@@ -50,37 +102,23 @@ def extract_job_name_from_text(text):
 # ============================================================
 #  ITEM BLOCK HELPERS
 # ============================================================
-def is_truck_code(line):
-    return bool(re.fullmatch(r"[A-Z]{3}\d", line))
-
-def is_quantity_line(line):
-    return bool(re.fullmatch(r"\d+(\.\d+)?\s*TN", line.upper()))
-
-def is_unit_price(line):
-    return bool(re.fullmatch(r"\d+(\.\d{1,4})?", line))
-
-def is_extended_price(line):
-    return bool(re.fullmatch(r"\d+(\.\d{2})", line))
+def classify_line(line):
+    """Return 'truck', 'qty', 'ext', 'unit' or None for a block line."""
+    m = _CLASSIFY_RE.fullmatch(line)
+    return m.lastgroup if m else None
 
 
 # ============================================================
 #  ITEM BLOCK EXTRACTION
 # ============================================================
-def extract_item_blocks(text):
-    """Extract 6-line load blocks from invoice text."""
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+def extract_item_blocks(lines):
+    """Extract 6-line load blocks from the invoice text lines."""
     blocks = []
     current = []
 
-    bad_words = {
-        "item", "description", "special", "instructions",
-        "subtotal", "total", "sales", "discount",
-        "taxable", "nontaxable", "kr-mtn", "quantity"
-    }
-
     for line in lines:
 
-        if any(word in line.lower() for word in bad_words):
+        if _BAD_WORDS_RE.search(line):
             continue
 
         # Ticket number starts block
@@ -95,11 +133,16 @@ def extract_item_blocks(text):
             if len(current) == 6:
                 ticket, desc, truck, qty, unit, ext = current
 
+                # Cheap shape checks first; the regex only runs on lines
+                # that could possibly match.
                 if (
-                    is_truck_code(truck)
-                    and is_quantity_line(qty)
-                    and is_unit_price(unit)
-                    and is_extended_price(ext)
+                    len(truck) == 4 and truck[0].isalpha() and truck[3].isdigit()
+                    and classify_line(truck) == "truck"
+                    and qty[-2:].upper() == "TN"
+                    and classify_line(qty) == "qty"
+                    and classify_line(unit) in ("unit", "ext")
+                    and "." in ext
+                    and classify_line(ext) == "ext"
                 ):
                     blocks.append(current)
 
@@ -113,58 +156,94 @@ def extract_item_blocks(text):
 # ============================================================
 def parse_block(block, jobname):
     ticket, desc, truck, qty, unit, ext = block
-    return {
-        "job_name": jobname,
-        "ticket": ticket,
-        "description": desc,
-        "truck": truck,
-        "quantity_tons": float(qty.replace("TN", "").strip()),
-        "unit_price": float(unit),
-        "extended_price": float(ext),
-    }
+    return LineItem(
+        job_name=jobname,
+        ticket=ticket,
+        description=desc,
+        truck=truck,
+        # qty already matched '<number> TN'; float() ignores the trailing space
+        quantity_tons=float(qty[:-2]),
+        unit_price=float(unit),
+        extended_price=float(ext),
+    )
 
 
 # ============================================================
-#  BATCH PROCESSING (auto-find matching subfolders)
+#  PER-PDF WORKER
 # ============================================================
-def batch_process_folder():
+
+
+def _process_one_pdf(pdf):
     """
-    User selects a YEAR folder (e.g., '2025').
-    Script finds ALL subfolders named exactly like the script filename.
-    Then processes all PDFs inside them.
+    Parse one Knife River PDF (runs in a worker process).
+    Returns (pdf, items, note, unreadable) for batch_export.export_pdfs,
+    where note is a status line to print, or None when loads were found.
     """
+    try:
+        doc = open_pdf(pdf)
+    except Exception as e:
+        return pdf, [], f"   Skipping unreadable file: {e}", True
+
+    try:
+        # MuPDF's (case-insensitive) search, page by page until the first
+        # page with a hit, so non-invoices never get their lines extracted.
+        if not any(page.search_for("ORIGINAL") for page in doc):
+            return pdf, [], "   Skipping (not a haul invoice – no ORIGINAL found)", False
+
+        lines = list(iter_doc_lines(doc))
+
+        # stops at the first truck code instead of tokenizing the whole PDF
+        has_truck = any(
+            _TRUCK_RE.fullmatch(w) for ln in lines for w in ln.split()
+        )
+        if not has_truck:
+            return pdf, [], "   Skipping (no truck codes found)", False
+
+        jobname = extract_job_name_from_text(lines)
+        blocks = extract_item_blocks(lines)
+
+        if not blocks:
+            return pdf, [], "   No load blocks found.", False
+
+        return pdf, [parse_block(block, jobname) for block in blocks], None, False
+
+    except Exception as e:
+        return pdf, [], f"   Skipping (parse error): {e}", False
 
-    # ----------------------------
-    # Get this script's name
-    # e.g. "Knife River.py" → "Knife River"
-    # ----------------------------
-    SCRIPT_NAME = os.path.splitext(os.path.basename(__file__))[0].strip()
+    finally:
+        close_pdf(doc)
 
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
 
-    top_folder = filedialog.askdirectory(title=f"Select top folder (contains subfolders with '{SCRIPT_NAME}')")
-    if not top_folder:
-        print("Batch cancelled.")
-        return None
+# ============================================================
+#  BATCH PROCESSING (auto-find matching subfolders)
+# ============================================================
+# ----------------------------
+# Get this script's name
+# e.g. "Knife River.py" → "Knife River"
+# ----------------------------
+SCRIPT_NAME = os.path.splitext(os.path.basename(__file__))[0].strip()
 
+
+def process_folders(top_folder, save_path):
+    """
+    Given a YEAR folder (e.g., '2025'), find ALL subfolders named
+    exactly like the script filename and process all PDFs inside them,
+    writing each load to save_path as soon as its PDF is parsed.
+    save_path may be a callable (e.g. batch_export.ask_save_path); it is
+    only called once there is a load to write, so a run with nothing to
+    export shows no save dialog and creates no file.
+    Returns the number of loads exported.
+    """
     top_folder = os.path.normpath(top_folder)
 
     # ============================================================
     # === NEW FOLDER SEARCH LOGIC: find all subfolders matching script name
     # ============================================================
-    matched_folders = []
-
-    for root_dir, dirs, files in os.walk(top_folder):
-        for d in dirs:
-            if d.lower() == SCRIPT_NAME.lower():
-                full_path = os.path.join(root_dir, d)
-                matched_folders.append(full_path)
+    matched_folders = find_named_folders(top_folder, SCRIPT_NAME)
 
     if not matched_folders:
         print(f"\nNo folders named '{SCRIPT_NAME}' found under:\n{top_folder}")
-        return None
+        return 0
 
     print("\nFound matching folders:")
     for f in matched_folders:
@@ -173,119 +252,68 @@ def batch_process_folder():
     # ============================================================
     # Process PDFs from all matched folders
     # ============================================================
-    all_items = []
     bad_files = 0
 
-    for folder in matched_folders:
-        print(f"\n📂 Processing folder: {folder}")
-
-        pdf_files = [
-            os.path.join(folder, f)
-            for f in os.listdir(folder)
-            if f.lower().endswith(".pdf")
-        ]
-
-        if not pdf_files:
-            print("   No PDF files found in this folder.")
-            continue
-
-        for pdf in pdf_files:
-            pdf = os.path.normpath(pdf)
-            print(f"\nProcessing: {os.path.basename(pdf)}")
+    writer = XlsxRowWriter(save_path, "Loads", EXPORT_HEADER)
+    try:
+        with open_pool() as pool:
+            for folder in matched_folders:
+                print(f"\n📂 Processing folder: {folder}")
 
-            try:
-                text = extract_pdf_text(pdf)
-            except Exception as e:
-                print(f"   Skipping unreadable file: {e}")
-                bad_files += 1
-                continue
+                pdf_files = list_pdfs(folder)
 
-            if "ORIGINAL" not in text.upper():
-                print("   Skipping (not a haul invoice – no ORIGINAL found)")
-                continue
+                if not pdf_files:
+                    print("   No PDF files found in this folder.")
+                    continue
 
-            words = text.split()
-            has_truck = any(re.fullmatch(r"[A-Z]{3}\d", w) for w in words)
-            if not has_truck:
-                print("   Skipping (no truck codes found)")
-                continue
+                bad_files += export_pdfs(pool, _process_one_pdf, pdf_files, writer)
+    except ExportCancelled:
+        print("Export cancelled.")
+        return 0
+    finally:
+        writer.close()
 
-            jobname = extract_job_name_from_text(text)
-            blocks = extract_item_blocks(text)
+    print(f"\nFinished batch.")
+    print(f"Extracted loads: {writer.rows}")
+    print(f"Unreadable PDFs skipped: {bad_files}")
 
-            if not blocks:
-                print("   No load blocks found.")
-                continue
+    if not writer.rows:
+        print("\nNo items extracted.")
+        return 0
 
-            for block in blocks:
-                item = parse_block(block, jobname)
-                all_items.append(item)
+    print(f"\nBatch Excel exported to:\n{writer.save_path}")
+    return writer.rows
 
-    print(f"\nFinished batch.")
-    print(f"Extracted loads: {len(all_items)}")
-    print(f"Unreadable PDFs skipped: {bad_files}")
 
-    return all_items
+def batch_process_folder():
+    """
+    User selects a YEAR folder (e.g., '2025'), then process_folders()
+    does the work; the output workbook is asked for once the first
+    load is found. Returns the number of loads exported.
+    """
+    return batch_export.batch_process_folder(SCRIPT_NAME, process_folders)
 
 
 # ============================================================
 #  EXPORT TO EXCEL
 # ============================================================
-def export_batch_to_excel(all_items):
-    """Save ALL parsed items to one Excel workbook."""
-
-    if not all_items:
-        print("Nothing to export.")
-        return
-
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-
-    save_path = filedialog.asksaveasfilename(
-        defaultextension=".xlsx",
-        filetypes=[("Excel Files", "*.xlsx")],
-        title="Save Batch Results As"
-    )
-
-    if not save_path:
-        print("Export cancelled.")
-        return
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Loads"
-
-    ws.append([
-        "Job Name", "Ticket", "Description", "Truck",
-        "Quantity (Tons)", "Unit Price", "Extended Price"
-    ])
-
-    for item in all_items:
-        ws.append([
-            item["job_name"],
-            item["ticket"],
-            item["description"],
-            item["truck"],
-            item["quantity_tons"],
-            item["unit_price"],
-            item["extended_price"]
-        ])
-
-    wb.save(save_path)
-    print(f"\nBatch Excel exported to:\n{save_path}")
+EXPORT_HEADER = [
+    "Job Name", "Ticket", "Description", "Truck",
+    "Quantity (Tons)", "Unit Price", "Extended Price"
+]
 
 
 # ============================================================
 #  MAIN
 # ============================================================
-if __name__ == "__main__":
-    print("Select the TOP folder (e.g., 2025)...")
+def main(argv=None):
+    batch_export.main(
+        argv,
+        "Extract Knife River loads from PDFs into one Excel workbook.",
+        SCRIPT_NAME,
+        process_folders,
+    )
 
-    all_items = batch_process_folder()
 
-    if all_items:
-        print("\nExporting to Excel...")
-        export_batch_to_excel(all_items)
-    else:
-        print("\nNo items extracted.")
+if __name__ == "__main__":
+    main()
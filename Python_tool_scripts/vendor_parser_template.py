@@ -22,6 +22,27 @@
 import fitz  # PyMuPDF
 import re
 
+from parse_cache import close_pdf
+
+# ------------------------------------------------------------
+# Field patterns — compiled once here, used for every page.
+# ------------------------------------------------------------
+VENDOR_RE = re.compile(r"^[A-Z][A-Z0-9 ]{3,}$")
+VENDOR_HEADER_LINES = 20   # the vendor name sits in the page header
+
+# Each field is ONE regex: add vendor labels as extra alternatives
+# so the page text is scanned once per field (earliest match wins).
+INV_NUM_RE = re.compile(
+    r"(?i)(?:Invoice\s*#\s*|Inv\s*#\s*|Invoice Number[:\s]*)([A-Za-z0-9\-]+)"
+)
+
+DATE_RE = re.compile(r"(\d{2}/\d{2}/\d{4}|\d{4}-\d{2}-\d{2})")
+
+TOTAL_RE = re.compile(
+    r"(?i)(?:Total|Amount Due|Balance Due)[:\s]*\$?([0-9\.,]+)"
+)
+
+
 # ------------------------------------------------------------
 # Extract ALL text from a PDF — page by page
 # ------------------------------------------------------------
@@ -30,11 +51,15 @@ def extract_pdf_text(pdf_path):
     doc = fitz.open(pdf_path)
     pages = []
 
-    for i, page in enumerate(doc):
-        text = page.get_text("text")
-        pages.append((i + 1, text))
-
-    doc.close()
+    try:
+        for i, page in enumerate(doc):
+            # same text as "text" mode; joining the blocks is cheaper
+            text = "".join(
+                b[4] for b in page.get_text("blocks", flags=fitz.TEXTFLAGS_TEXT)
+            )
+            pages.append((i + 1, text))
+    finally:
+        close_pdf(doc)
     return pages
 
 
@@ -51,36 +76,45 @@ def parse_invoice(pdf_path):
         - list of dicts (multi-invoice PDFs)
     """
 
-    pages = extract_pdf_text(pdf_path)
-
     # --------------------------------------------------------
     # DEFAULT RESULT (empty shell — you will fill rules)
     # --------------------------------------------------------
     results = []
 
-    for page_num, text in pages:
-
-        # Build a dictionary for this page.
-        # You will modify the extraction logic per vendor.
-        inv = {
-            "vendor": "",           # MUST fill
-            "invoice_number": "",   # MUST fill
-            "jobname": "",          # if unknown leave ""
-            "date": "",             # MUST fill
-            "total": "",            # MUST fill
-            "page": page_num,
-        }
-
-        # ----------------------------------------------------
-        # 🧩 STEP 1 — FILL IN Simple Defaults
-        # ----------------------------------------------------
-        inv["vendor"] = detect_vendor_name(text)
-        inv["invoice_number"] = detect_invoice_number(text)
-        inv["date"] = detect_invoice_date(text)
-        inv["total"] = detect_invoice_total(text)
-        inv["jobname"] = detect_jobname(text)
-
-        results.append(inv)
+    # Pages are read and parsed one at a time, so only the current
+    # page's text is held in memory.
+    doc = fitz.open(pdf_path)
+    try:
+        for i, page in enumerate(doc):
+            page_num = i + 1
+            # same text as "text" mode; joining the blocks is cheaper
+            text = "".join(
+                b[4] for b in page.get_text("blocks", flags=fitz.TEXTFLAGS_TEXT)
+            )
+
+            # Build a dictionary for this page.
+            # You will modify the extraction logic per vendor.
+            inv = {
+                "vendor": "",           # MUST fill
+                "invoice_number": "",   # MUST fill
+                "jobname": "",          # if unknown leave ""
+                "date": "",             # MUST fill
+                "total": "",            # MUST fill
+                "page": page_num,
+            }
+
+            # ----------------------------------------------------
+            # 🧩 STEP 1 — FILL IN Simple Defaults
+            # ----------------------------------------------------
+            inv["vendor"] = detect_vendor_name(text)
+            inv["invoice_number"] = detect_invoice_number(text)
+            inv["date"] = detect_invoice_date(text)
+            inv["total"] = detect_invoice_total(text)
+            inv["jobname"] = detect_jobname(text)
+
+            results.append(inv)
+    finally:
+        close_pdf(doc)
 
     # If only one invoice → return dict
     if len(results) == 1:
@@ -96,53 +130,33 @@ def parse_invoice(pdf_path):
 def detect_vendor_name(text):
     """Override this for each vendor."""
     # Example detects uppercase line at top
-    match = re.search(r"^([A-Z][A-Z0-9 ]{3,})$", text, re.MULTILINE)
-    return match.group(1).strip() if match else ""
+    for ln in text.split("\n", VENDOR_HEADER_LINES)[:VENDOR_HEADER_LINES]:
+        if VENDOR_RE.match(ln):
+            return ln.strip()
+    return ""
 
 
 def detect_invoice_number(text):
     """Override with vendor-specific rules."""
-    # Example: look for 'Invoice #' or 'Inv #'
-    patterns = [
-        r"Invoice\s*#\s*([A-Za-z0-9\-]+)",
-        r"Inv\s*#\s*([A-Za-z0-9\-]+)",
-        r"Invoice Number[:\s]*([A-Za-z0-9\-]+)"
-    ]
-    for pat in patterns:
-        m = re.search(pat, text, re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-    return ""
+    # Example: look for 'Invoice #' or 'Inv #' (see INV_NUM_RE)
+    m = INV_NUM_RE.search(text)
+    return m.group(1).strip() if m else ""
 
 
 def detect_invoice_date(text):
     """Override with vendor-specific date patterns."""
-    # Example: 01/01/2025 or 2025-01-01
-    patterns = [
-        r"(\d{2}/\d{2}/\d{4})",
-        r"(\d{4}-\d{2}-\d{2})",
-    ]
-    for pat in patterns:
-        m = re.search(pat, text)
-        if m:
-            return m.group(1).strip()
-    return ""
+    # Example: 01/01/2025 or 2025-01-01 (see DATE_RE)
+    # The match is digits and separators only, so no strip is needed.
+    m = DATE_RE.search(text)
+    return m.group(1) if m else ""
 
 
 def detect_invoice_total(text):
     """Override for vendor-specific totals."""
     # Example:
-    #   Total: $1,234.56
-    patterns = [
-        r"Total[:\s]*\$?([0-9\.,]+)",
-        r"Amount Due[:\s]*\$?([0-9\.,]+)",
-        r"Balance Due[:\s]*\$?([0-9\.,]+)",
-    ]
-    for pat in patterns:
-        m = re.search(pat, text, re.IGNORECASE)
-        if m:
-            return m.group(1).replace(",", "").strip()
-    return ""
+    #   Total: $1,234.56  (see TOTAL_RE)
+    m = TOTAL_RE.search(text)
+    return m.group(1).replace(",", "").strip() if m else ""
 
 
 def detect_jobname(text):
@@ -0,0 +1,216 @@
+import os
+import argparse
+import multiprocessing
+import fitz
+from openpyxl import Workbook
+
+try:
+    import xlsxwriter  # faster, constant-memory export when installed
+except ImportError:
+    xlsxwriter = None
+
+
+# ============================================================
+#  PDF HANDLING
+# ============================================================
+def close_pdf(doc):
+    """
+    Close doc and empty MuPDF's store: it keeps fonts/images cached
+    across documents, so a long batch would keep growing.
+    """
+    doc.close()
+    fitz.TOOLS.store_shrink(100)
+
+
+# ============================================================
+#  FOLDER SEARCH
+# ============================================================
+def find_named_folders(top, name):
+    """
+    Return every folder under top named `name` (case-insensitive),
+    in the same top-down order os.walk would report them.
+    Only directories are scanned; files are never stat'ed.
+    """
+    target = name.lower()
+    found = []
+    stack = [top]
+
+    while stack:
+        cur = stack.pop()
+        try:
+            with os.scandir(cur) as it:
+                subdirs = [e for e in it if e.is_dir()]
+        except OSError:
+            continue
+
+        for e in subdirs:
+            if e.name.lower() == target:
+                found.append(e.path)
+
+        # push in reverse so the first subfolder is visited next
+        stack.extend(
+            e.path for e in reversed(subdirs) if not e.is_symlink()
+        )
+
+    return found
+
+
+def list_pdfs(folder):
+    """Return paths of the .pdf files directly inside folder."""
+    with os.scandir(folder) as it:
+        return [
+            entry.path
+            for entry in it
+            if entry.is_file() and entry.name.lower().endswith(".pdf")
+        ]
+
+
+# ============================================================
+#  PARALLEL PARSING
+# ============================================================
+# PyMuPDF parsing is CPU-bound, so PDFs are spread over a small pool.
+BATCH_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+def open_pool():
+    """Worker pool for export_pdfs(); use it as a context manager."""
+    return multiprocessing.Pool(BATCH_WORKERS)
+
+
+def export_pdfs(pool, process_one, pdfs, writer):
+    """
+    Run process_one over pdfs on pool and append every item it returns
+    to writer, printing each file's status as its result comes back.
+
+    process_one(pdf) returns (pdf, items, note, unreadable): note is a
+    status line (a plain string, so it always pickles) or None, and
+    unreadable marks a file that could not be opened.
+    Returns the number of unreadable files.
+    """
+    bad_files = 0
+
+    # imap keeps results in folder order so the export is stable
+    for pdf, items, note, unreadable in pool.imap(process_one, pdfs, chunksize=4):
+        print(f"\nProcessing: {os.path.basename(pdf)}")
+
+        if note:
+            print(note)
+        if unreadable:
+            bad_files += 1
+
+        # items are LineItem tuples, already in column order
+        for item in items:
+            writer.append(item)
+
+    return bad_files
+
+
+# ============================================================
+#  EXPORT TO EXCEL
+# ============================================================
+class ExportCancelled(Exception):
+    """The user closed the save dialog without picking a file."""
+
+
+class XlsxRowWriter:
+    """
+    Append-only single-sheet workbook. Rows go straight to disk
+    (xlsxwriter constant_memory, or openpyxl write-only as fallback).
+
+    save_path is a path, or a callable returning one (e.g. ask_save_path).
+    Nothing is asked or created until the first row arrives, so a batch
+    with no rows leaves no file behind.
+    """
+
+    def __init__(self, save_path, sheet_title, header):
+        self.save_path = save_path
+        self.sheet_title = sheet_title
+        self.header = header
+        self.rows = 0
+        self._wb = None
+
+    def _open(self):
+        if callable(self.save_path):
+            self.save_path = self.save_path()
+            if not self.save_path:
+                raise ExportCancelled()
+
+        if xlsxwriter is not None:
+            self._wb = xlsxwriter.Workbook(self.save_path, {"constant_memory": True})
+            self._ws = self._wb.add_worksheet(self.sheet_title)
+            self._ws.write_row(0, 0, self.header)
+        else:
+            self._wb = Workbook(write_only=True)
+            self._ws = self._wb.create_sheet(self.sheet_title)
+            self._ws.append(self.header)
+
+    def append(self, row):
+        if self._wb is None:
+            self._open()
+
+        self.rows += 1
+        if xlsxwriter is not None:
+            self._ws.write_row(self.rows, 0, row)
+        else:
+            self._ws.append(row)
+
+    def close(self):
+        if self._wb is None:
+            return
+        if xlsxwriter is not None:
+            self._wb.close()
+        else:
+            self._wb.save(self.save_path)
+
+
+def ask_save_path():
+    from tkinter import Tk, filedialog
+
+    root = Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+
+    return filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        filetypes=[("Excel Files", "*.xlsx")],
+        title="Save Batch Results As"
+    )
+
+
+# ============================================================
+#  ENTRY POINTS
+# ============================================================
+def batch_process_folder(script_name, process_folders):
+    """
+    Ask for the top folder, then run process_folders(top_folder, save_path).
+    The output workbook is only asked for once the first row is ready.
+    Tk is only loaded for this interactive path.
+    """
+    from tkinter import Tk, filedialog
+
+    root = Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+
+    top_folder = filedialog.askdirectory(title=f"Select top folder (contains subfolders with '{script_name}')")
+    if not top_folder:
+        print("Batch cancelled.")
+        return 0
+
+    return process_folders(top_folder, ask_save_path)
+
+
+def main(argv, description, script_name, process_folders):
+    """Command line for a batch script: --top-folder/--out, or dialogs."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--top-folder", help=f"folder containing '{script_name}' subfolders")
+    parser.add_argument("--out", help="path of the .xlsx file to write")
+    args = parser.parse_args(argv)
+
+    if args.top_folder or args.out:
+        if not (args.top_folder and args.out):
+            parser.error("--top-folder and --out must be given together")
+        process_folders(args.top_folder, args.out)
+    else:
+        print("Select the TOP folder (e.g., 2025)...")
+        batch_process_folder(script_name, process_folders)
@@ -1,119 +1,198 @@
 import fitz
 import re
+from parse_cache import ParseCache
+
+# ------------------------------------------------------------
+# Patterns compiled once at import, not per page.
+# ------------------------------------------------------------
+_INV_RE = re.compile(r"(?i)Invoice\s*#\s*\n\s*([A-Z0-9]+)")
+_DATE_HDR_RE = re.compile(r"Invoice Date\s*\n\s*([0-9/]+)")
+_TOTAL_RE = re.compile(r"Total Amount Due\s*\n\s*\$?([0-9,]+\.[0-9]+)")
+
+# The job name patterns below only deal in ASCII, so they get (?a):
+# ASCII-only case folding, no Unicode lookups.
+
+# Junk label lines that can't be the job name (any case); dates and
+# invoice-like codes are caught by _is_date_line / _is_invoice_code
+_SKIP_RE = re.compile(
+    r"(?a)(?i:job #|bill of lading|shipped via|invoice|date ordered|date shipped)"
+)
+# First three letters of every _SKIP_RE label; other lines never need it
+_SKIP_HEADS = frozenset(("job", "bil", "shi", "inv", "dat"))
+_DATE_RE = re.compile(r"(?a)[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}$")
+
+# Literal job markers under a standalone 'Job Name' anchor (whole line)
+_JOB_MARKER_RE = re.compile(r"(?a)(?i)job #|job#|job no|job number")
+
+
+def _page_text(page):
+    """
+    Page text as "text" mode would return it, built from the text
+    blocks (each block already ends in a newline), which is cheaper.
+    """
+    return "".join(
+        b[4] for b in page.get_text("blocks", flags=fitz.TEXTFLAGS_TEXT)
+    )
+
+
+def _is_invoice_code(line):
+    """True for invoice-like codes, i.e. ^[A-Z0-9]{6,}$, without a regex."""
+    return (
+        len(line) >= 6 and line.isascii() and line.isalnum()
+        and (line.isupper() or line.isdigit())
+    )
+
+
+def _is_date_line(line):
+    """True for M/D/YY .. MM/DD/YYYY lines; most lines fail before the regex."""
+    return (
+        6 <= len(line) <= 10 and line[0].isdigit() and "/" in line
+        and _DATE_RE.match(line) is not None
+    )
+
+
+def _is_skip_line(line):
+    """Invoice-like code, date or junk label: never the job name."""
+    return (
+        _is_invoice_code(line)
+        or _is_date_line(line)
+        or (line[:3].lower() in _SKIP_HEADS and _SKIP_RE.match(line) is not None)
+    )
+
+
+def _find_po_job_header(low):
+    """
+    Index of the first line of the lowercased page text `low` holding
+    both 'customer po #' and 'job name', or None.
+    """
+    pos = low.find("customer po #")
+    while pos != -1:
+        start = low.rfind("\n", 0, pos) + 1
+        end = low.find("\n", pos)
+        if end == -1:
+            end = len(low)
+
+        if "job name" in low[start:end]:
+            return low.count("\n", 0, start)
+
+        pos = low.find("customer po #", end)
+
+    return None
+
+
+def _find_jobname(text):
+    """Return the job name on a Core & Main page, or 'UNKNOWN'."""
+    jobname = "UNKNOWN"
+
+    # Both anchors contain 'job name'; pages without it skip the
+    # line split and the scans below entirely.
+    if "job name" not in text.lower():
+        return jobname
+
+    lines = [s for ln in text.splitlines() if (s := ln.strip())]
+
+    # Lowercase the page once and find the anchors with C-level
+    # str.find instead of lowercasing every line in a Python loop.
+    low = "\n".join(lines).lower()
+
+    idx = _find_po_job_header(low)
+    if idx is not None:
+        for nxt in lines[idx+1:]:
+
+            # skip invoice-like codes, dates (this was the problem)
+            # and junk lines
+            if _is_skip_line(nxt):
+                continue
+
+            # FOUND REAL JOB NAME
+            jobname = nxt.strip()
+            break
+
+    # ------------------------------------------------------------
+    # PATCH 3 — SECONDARY JOBNAME FALLBACK (correct insertion)
+    # ------------------------------------------------------------
+    if jobname == "UNKNOWN":
+        # Look for a standalone "Job Name" anchor. Later anchors only
+        # see a subset of the same lines, so the first one decides.
+        pos = ("\n" + low + "\n").find("\njob name\n")
+        if pos != -1:
+            idx = low.count("\n", 0, pos)
+
+            for nxt in lines[idx+1:]:
 
-def parse_invoice(pdf_path):
-    doc = fitz.open(pdf_path)
-    results = []
-
-    SKIP_PREFIXES = [
-        "job #",
-        "bill of lading",
-        "shipped via",
-        "invoice#",
-        "invoice #",
-        "invoice",
-        "date ordered",
-        "date shipped",
-    ]
-
-    DATE_RE = re.compile(r"^[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}$")
-
-    for page_index, page in enumerate(doc):
-        text = page.get_text("text")
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-
-        # -------------------------------
-        # INVOICE NUMBER
-        # -------------------------------
-        m_inv = re.search(r"Invoice\s*#\s*\n\s*([A-Z0-9]+)", text, re.IGNORECASE)
-        invoice_number = m_inv.group(1).strip() if m_inv else ""
-
-        # -------------------------------
-        # DATE
-        # -------------------------------
-        m_date = re.search(r"Invoice Date\s*\n\s*([0-9/]+)", text)
-        date_str = m_date.group(1).strip() if m_date else ""
-
-        # -------------------------------
-        # TOTAL
-        # -------------------------------
-        m_total = re.search(r"Total Amount Due\s*\n\s*\$?([0-9,]+\.[0-9]+)", text)
-        total = m_total.group(1).replace(",", "") if m_total else ""
-
-        # -------------------------------
-        # JOB NAME (FINAL WORKING VERSION)
-        # -------------------------------
-        jobname = "UNKNOWN"
-
-        for idx, line in enumerate(lines):
-            if "customer po #" in line.lower() and "job name" in line.lower():
-
-                for nxt in lines[idx+1:]:
-
-                    low = nxt.lower()
-
-                    # skip any junk lines
-                    if any(low.startswith(prefix) for prefix in SKIP_PREFIXES):
-                        continue
-
-                    # skip dates (this was the problem)
-                    if DATE_RE.match(nxt):
-                        continue
-
-                    # skip invoice-like codes
-                    if re.match(r"^[A-Z0-9]{6,}$", nxt):
-                        continue
-
-                    # FOUND REAL JOB NAME
-                    jobname = nxt.strip()
-                    break
+                # skip invoice-like codes, dates and junk terms
+                if _is_skip_line(nxt):
+                    continue
 
+                # skip literal job markers
+                if _JOB_MARKER_RE.fullmatch(nxt):
+                    continue
+
+                jobname = nxt.strip()
                 break
+    # ------------------------------------------------------------
+    # END PATCH 3
+    # ------------------------------------------------------------
+
+    return jobname
+
+
+def _parse_page(text, page_index):
+    """Parse one page's text into a result dict."""
+    # -------------------------------
+    # INVOICE NUMBER
+    # -------------------------------
+    m_inv = _INV_RE.search(text)
+    invoice_number = m_inv.group(1).strip() if m_inv else ""
+
+    # -------------------------------
+    # DATE
+    # -------------------------------
+    m_date = _DATE_HDR_RE.search(text)
+    date_str = m_date.group(1).strip() if m_date else ""
+
+    # -------------------------------
+    # TOTAL
+    # -------------------------------
+    m_total = _TOTAL_RE.search(text)
+    total = m_total.group(1).replace(",", "") if m_total else ""
+
+    # -------------------------------
+    # JOB NAME (FINAL WORKING VERSION)
+    # -------------------------------
+    jobname = _find_jobname(text)
+
+    return {
+        "vendor": "Core & Main",
+        "invoice_number": invoice_number,
+        "jobname": jobname,
+        "date": date_str,
+        "total": total,
+        "page": page_index + 1,
+    }
 
-        # ------------------------------------------------------------
-        # PATCH 3 — SECONDARY JOBNAME FALLBACK (correct insertion)
-        # ------------------------------------------------------------
-        if jobname == "UNKNOWN":
-            # Look for a standalone "Job Name" anchor
-            for idx, line in enumerate(lines):
-                if line.lower() == "job name":
-
-                    for nxt in lines[idx+1:]:
-                        low = nxt.lower()
-
-                        # skip junk terms
-                        if any(low.startswith(prefix) for prefix in SKIP_PREFIXES):
-                            continue
 
-                        # skip dates
-                        if DATE_RE.match(nxt):
-                            continue
-
-                        # skip invoice-like codes
-                        if re.match(r"^[A-Z0-9]{6,}$", nxt):
-                            continue
+def parse_invoice(pdf_path):
+    return _PARSE_CACHE.parse_path(pdf_path)
 
-                        # skip literal job markers
-                        if low in ("job #", "job#", "job no", "job number"):
-                            continue
 
-                        jobname = nxt.strip()
-                        break
+def parse_invoice_doc(doc):
+    """
+    Same as parse_invoice() for a fitz.Document the caller already has
+    open (and closes), so the PDF is only parsed by MuPDF once.
+    """
+    return _PARSE_CACHE.parse_open_doc(doc)
 
-                if jobname != "UNKNOWN":
-                    break
-        # ------------------------------------------------------------
-        # END PATCH 3
-        # ------------------------------------------------------------
 
-        results.append({
-            "vendor": "Core & Main",
-            "invoice_number": invoice_number,
-            "jobname": jobname,
-            "date": date_str,
-            "total": total,
-            "page": page_index + 1,
-        })
+def _parse_doc(doc):
+    """Parse every page of an open document, one page at a time."""
+    results = []
+    for page_index in range(doc.page_count):
+        page = doc.load_page(page_index)
+        results.append(_parse_page(_page_text(page), page_index))
+        page = None  # release the page before loading the next one
+    return results
 
 
-    return results
+# Parsed results keyed by (path, mtime_ns, size); see parse_cache.py
+_PARSE_CACHE = ParseCache(_parse_doc)
@@ -2,6 +2,10 @@ import fitz  # PyMuPDF
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
+import io
+import sys
+
+from parse_cache import close_pdf
 
 # ============================================================
 # extract_pdf_template.py
@@ -12,37 +16,54 @@ import os
 
 
 def extract_pdf_text(pdf_path):
-    """Return list: [ (page_number, text), ... ]"""
+    """
+    Open the PDF and return a generator of (page_number, text),
+    so only one page's text is held at a time.
+    Opening happens here, so a bad file fails before anything is written.
+    """
     doc = fitz.open(pdf_path)
-    pages = []
+    return _iter_page_text(doc)
 
-    for i, page in enumerate(doc):
-        text = page.get_text("text")
-        pages.append((i + 1, text))
 
-    doc.close()
-    return pages
+def _iter_page_text(doc):
+    try:
+        for i, page in enumerate(doc):
+            # same text as "text" mode; joining the blocks is cheaper
+            text = "".join(
+                b[4] for b in page.get_text("blocks", flags=fitz.TEXTFLAGS_TEXT)
+            )
+            yield i + 1, text
+    finally:
+        close_pdf(doc)
 
 
-def format_extracted_text(pages):
+def write_extracted(pages, *outs):
     """
-    Build a clean and numbered text dump to help writing templates.
+    Write a clean and numbered text dump to help writing templates,
+    one page at a time, to every stream in outs.
     Adds page separators and line numbers.
     """
-    out_lines = []
+    rule = "=" * 60
+    for n, (page_num, text) in enumerate(pages):
+        header = (
+            ("\n" if n else "")  # blank line between pages
+            + f"{rule}\n===================== PAGE {page_num} =====================\n{rule}\n"
+        )
+        body = "".join(
+            "%4d: %s\n" % (i, line)
+            for i, line in enumerate(text.splitlines(), 1)
+        )
+
+        for out in outs:
+            out.write(header)
+            out.write(body)
 
-    for page_num, text in pages:
-        out_lines.append("=" * 60)
-        out_lines.append(f"===================== PAGE {page_num} =====================")
-        out_lines.append("=" * 60)
 
-        for i, line in enumerate(text.splitlines()):
-            line_num = str(i + 1).rjust(4)
-            out_lines.append(f"{line_num}: {line}")
-
-        out_lines.append("")  # blank line
-
-    return "\n".join(out_lines)
+def format_extracted_text(pages):
+    """Return the whole numbered text dump as one string."""
+    buf = io.StringIO()
+    write_extracted(pages, buf)
+    return buf.getvalue()
 
 
 def pick_pdf():
@@ -71,17 +92,12 @@ def main():
         print(f"Could not read PDF:\n{e}")
         return
 
-    formatted = format_extracted_text(pages)
-
-    # Print to console
-    print(formatted)
-
-    # Save .txt next to the PDF
+    # Print to console and save .txt next to the PDF, page by page
     out_txt = os.path.splitext(pdf_path)[0] + "_EXTRACTED.txt"
     try:
         with open(out_txt, "w", encoding="utf-8") as f:
-            f.write(formatted)
-        print(f"\nSaved extract to:\n{out_txt}")
+            write_extracted(pages, sys.stdout, f)
+        print(f"\n\nSaved extract to:\n{out_txt}")
     except Exception as e:
         print(f"Could not save text output:\n{e}")
 
@@ -1,11 +1,18 @@
 import os
+import re
 import shutil
+import importlib
+import functools
+from collections import OrderedDict
 import fitz  # PyMuPDF
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 from openpyxl import Workbook, load_workbook
 
+import parse_cache
+from batch_export import list_pdfs
+
 # ============================================================
 # VENDOR PARSER ALIASES  (folder name → parser module)
 # ============================================================
@@ -33,7 +40,32 @@ JOB_LIST_PATH = os.path.join(ROOT_DIR, "helperfiles","jobs.txt")
 # Billing summary root (inside ROOT_DIR)
 BILLING_SUMMARY_ROOT = os.path.join(ROOT_DIR, "Billing_Summary")
 
+# Wheel events arriving within this many ms collapse into one preview render
+ZOOM_RENDER_DELAY_MS = 50
+
+# Rendered preview images kept per (file, page, zoom), including the
+# first pages of the invoices next to the selected one
+PREVIEW_CACHE_SIZE = 8
+
+# Parse results kept per (parser, file); Knife River / Missoula results
+# carry each page's raw text, so this stays small
+PARSE_CACHE_SIZE = 32
+
+
+# The preview keeps its PDF open while invoices are parsed; don't let the
+# parsers empty MuPDF's store (and that document's fonts/images) each time
+parse_cache.SHRINK_STORE = False
+
+
+# Characters Excel forbids in sheet names / Windows forbids in file names
+_BAD_SHEET_RE = re.compile(r"[:\\/?*\[\]]")
+_BAD_FILE_RE = re.compile(r"[\"':?*<>|]")
+
+# Runs of anything that can't appear in a parser module name
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+
 
+@functools.lru_cache(maxsize=256)
 def sanitize_sheet_title(title: str) -> str:
     """
     Sanitize an Excel sheet name:
@@ -41,30 +73,31 @@ def sanitize_sheet_title(title: str) -> str:
     - Trim to 31 characters.
     - Fallback to 'Sheet1' if empty.
     """
-    forbidden = [":", "\\", "/", "?", "*", "[", "]"]
-    cleaned = "".join(ch for ch in title if ch not in forbidden)
-    cleaned = cleaned.strip()
-    if not cleaned:
-        cleaned = "Sheet1"
-    if len(cleaned) > 31:
-        cleaned = cleaned[:31]
-    return cleaned
+    cleaned = _BAD_SHEET_RE.sub("", title).strip() or "Sheet1"
+    return cleaned[:31]
 
 
-def safe_move(src: str, dst_folder: str) -> str:
+def safe_move(src: str, dst_folder: str, make_dirs: bool = True) -> str:
     """
-    Move src file into dst_folder.
+    Move src file into dst_folder (created first unless make_dirs is False,
+    for callers that already made it).
     If a file with the same name exists, append _1, _2, ... before the extension.
     Returns final destination path.
     """
-    os.makedirs(dst_folder, exist_ok=True)
+    if make_dirs:
+        os.makedirs(dst_folder, exist_ok=True)
     base = os.path.basename(src)
     name, ext = os.path.splitext(base)
     candidate = os.path.join(dst_folder, base)
-    counter = 1
-    while os.path.exists(candidate):
+    if os.path.exists(candidate):
+        # one directory listing instead of a stat per numbered candidate;
+        # normcase keeps the check case-insensitive on Windows
+        with os.scandir(dst_folder) as it:
+            existing = {os.path.normcase(e.name) for e in it}
+        counter = 1
+        while os.path.normcase(f"{name}_{counter}{ext}") in existing:
+            counter += 1
         candidate = os.path.join(dst_folder, f"{name}_{counter}{ext}")
-        counter += 1
     shutil.move(src, candidate)
     return candidate
 
@@ -77,16 +110,26 @@ class InvoiceSorterUI(tk.Tk):
         self.configure(bg="#1e1e1e")
 
         self.zoom_level = 1.5
+        self._render_job = None         # pending after() id for the preview render
+        self._pdf_image_id = None       # canvas item showing the preview
+        self._preview_cache = OrderedDict()  # (path, page, zoom) -> PhotoImage, LRU
+        self._prefetch_paths = []       # neighbour invoices still to pre-render
+        self._prefetch_job = None       # pending after_idle() id for prefetching
 
         # state
         self.invoices = []              # list of pdf paths currently shown in left list
         self.current_folder = None      # current folder backing left list
         self.pdf_document = None        # fitz.Document for center preview
+        self.pdf_path = None            # path of pdf_document
         self.displayed_page = 0
         self.vendor_module_name = None  # e.g., "knife_river_parser"
         self.last_parsed_invoice = None # dict for currently selected invoice
+        self._parser_cache = {}         # module name -> imported parser module
+        self._parse_cache = OrderedDict()  # file key -> parse result, LRU
 
         self.jobnames = []              # list of job names loaded from file
+        self._job_lookup = {}           # casefolded job name -> job name
+        self._job_keys = []             # (lowercase name without spaces, list index)
         self.job_selection_auto = False # True when selection is auto-highlighted
 
         # Per-invoice info: path -> {"parsed": dict|None, "jobname": str|None, "staged": bool}
@@ -277,6 +320,8 @@ class InvoiceSorterUI(tk.Tk):
     # =========================================================
     def load_jobnames(self):
         self.jobnames = []
+        self._job_lookup = {}
+        self._job_keys = []
         self.job_list.delete(0, tk.END)
         if not os.path.exists(JOB_LIST_PATH):
             messagebox.showwarning(
@@ -286,11 +331,14 @@ class InvoiceSorterUI(tk.Tk):
             return
         try:
             with open(JOB_LIST_PATH, "r", encoding="utf-8") as f:
-                for line in f:
-                    name = line.strip()
-                    if name:
-                        self.jobnames.append(name)
-                        self.job_list.insert(tk.END, name)
+                names = [n for n in (line.strip() for line in f.read().splitlines()) if n]
+            self.jobnames = names
+            # one Tcl call for the whole list instead of one per job
+            self.job_list.insert(tk.END, *names)
+            # normalized lookup for auto-staging: "hamp" → "HAMP"
+            self._job_lookup = {n.casefold(): n for n in names}
+            # match keys for auto_highlight_job, so it never reads the Listbox
+            self._job_keys = [(n.lower().replace(" ", ""), i) for i, n in enumerate(names)]
         except Exception as e:
             messagebox.showerror("Error", f"Could not load job list:\n{e}")
 
@@ -340,11 +388,8 @@ class InvoiceSorterUI(tk.Tk):
             return
 
         self.current_folder = folder
-        self.invoices = [
-            os.path.join(folder, f)
-            for f in os.listdir(folder)
-            if f.lower().endswith(".pdf")
-        ]
+        self.invoices = list_pdfs(folder)
+        self._preview_cache.clear()
         self.invoice_info = {p: {"parsed": None, "jobname": None, "staged": False} for p in self.invoices}
         self.refresh_invoice_list()
 
@@ -368,19 +413,54 @@ class InvoiceSorterUI(tk.Tk):
         if raw in VENDOR_ALIASES:
             return VENDOR_ALIASES[raw]
 
-        # 2. Clean unexpected symbols (keep letters/numbers/underscores)
-        cleaned = "".join(ch if ch.isalnum() else "_" for ch in raw)
-        cleaned = "_".join(filter(None, cleaned.split("_")))  # collapse __
+        # 2. Clean unexpected symbols (keep letters/numbers/underscores);
+        #    each run becomes one "_", so "__" never appears
+        cleaned = _NON_ALNUM_RE.sub("_", raw).strip("_")
 
         return f"{cleaned}_parser"
 
     # =========================== PATCH END =============================
 
+    def _get_parser(self):
+        """Return the parser module for the current vendor, importing it once."""
+        mod = self._parser_cache.get(self.vendor_module_name)
+        if mod is None:
+            mod = importlib.import_module(self.vendor_module_name)
+            self._parser_cache[self.vendor_module_name] = mod
+        return mod
+
+    # =========================================================
+    # PARSE CACHE
+    # =========================================================
+    def _parse_cache_key(self, pdf_path: str):
+        # mtime + size is enough to notice an edited or replaced file
+        st = os.stat(pdf_path)
+        return (self.vendor_module_name, os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size)
+
+    def _cached_parse(self, pdf_path: str, parse=None):
+        """
+        Return the parse result for pdf_path, parsing (with parse, or the
+        vendor parser's parse_invoice) only if the file is not cached.
+        """
+        key = self._parse_cache_key(pdf_path)
+        result = self._parse_cache.get(key)
+        if result is not None:
+            self._parse_cache.move_to_end(key)
+            return result
+
+        if parse is None:
+            parse = self._get_parser().parse_invoice
+        result = parse(pdf_path)
+        self._parse_cache[key] = result
+        if len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+        return result
+
     def refresh_invoice_list(self):
         self.invoice_list.delete(0, tk.END)
-        for p in self.invoices:
-            idx = self.invoice_list.size()
-            self.invoice_list.insert(tk.END, os.path.basename(p))
+        # one Tcl call for all names, then recolor only the staged ones
+        self.invoice_list.insert(tk.END, *(os.path.basename(p) for p in self.invoices))
+        for idx, p in enumerate(self.invoices):
             info = self.invoice_info.get(p)
             if info and info.get("staged"):
                 # light gray for staged invoices
@@ -406,9 +486,10 @@ class InvoiceSorterUI(tk.Tk):
             pass
 
         try:
+            self.pdf_path = pdf_path
             self.pdf_document = fitz.open(pdf_path)
             self.displayed_page = 0
-            self.render_pdf()
+            self.schedule_render()
         except Exception as e:
             messagebox.showerror("Error", f"Cannot display PDF:\n{e}")
 
@@ -418,33 +499,107 @@ class InvoiceSorterUI(tk.Tk):
     # =========================================================
     # RENDER PDF
     # =========================================================
+    def schedule_render(self, delay: int = 0):
+        """
+        Render the preview from the Tk event loop after delay ms. A newer
+        request replaces a pending one, so bursts of zoom/selection events
+        cost a single render and the UI repaints in between.
+        """
+        if self._render_job is not None:
+            self.after_cancel(self._render_job)
+        self._render_job = self.after(delay, self._run_scheduled_render)
+
+    def _run_scheduled_render(self):
+        self._render_job = None
+        self.render_pdf()
+
+    def _preview_key(self, pdf_path: str, page_index: int):
+        return (pdf_path, page_index, self.zoom_level)
+
+    def _cache_preview(self, key, doc, page_index: int):
+        """Render page_index of doc at the current zoom and cache the PhotoImage."""
+        page = doc.load_page(page_index)
+        zoom = fitz.Matrix(self.zoom_level, self.zoom_level)
+        # 3-channel RGB, matching the "RGB" buffer handed to PIL below
+        pix = page.get_pixmap(matrix=zoom, alpha=False, colorspace=fitz.csRGB)
+
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        photo = ImageTk.PhotoImage(img)
+        self._preview_cache[key] = photo
+        if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+            self._preview_cache.popitem(last=False)
+        return photo
+
     def render_pdf(self):
         if not self.pdf_document:
             return
-        try:
-            page = self.pdf_document.load_page(self.displayed_page)
-        except Exception:
-            return
 
-        zoom = fitz.Matrix(self.zoom_level, self.zoom_level)
-        pix = page.get_pixmap(matrix=zoom)
+        key = self._preview_key(self.pdf_path, self.displayed_page)
+        photo = self._preview_cache.get(key)
+        if photo is not None:
+            self._preview_cache.move_to_end(key)
+        else:
+            try:
+                photo = self._cache_preview(key, self.pdf_document, self.displayed_page)
+            except Exception:
+                return
+        self.pdf_image_ref = photo  # keep reference
 
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        self.pdf_image_ref = ImageTk.PhotoImage(img)  # keep reference
+        # reuse the one canvas item instead of deleting and recreating it
+        if self._pdf_image_id is None:
+            self._pdf_image_id = self.pdf_canvas.create_image(0, 0, anchor="nw", image=photo)
+        else:
+            self.pdf_canvas.itemconfig(self._pdf_image_id, image=photo)
+        self.pdf_canvas.config(scrollregion=(0, 0, photo.width(), photo.height()))
 
-        self.pdf_canvas.delete("all")
-        self.pdf_canvas.create_image(0, 0, anchor="nw", image=self.pdf_image_ref)
-        self.pdf_canvas.config(scrollregion=self.pdf_canvas.bbox("all"))
+        self.queue_prefetch()
+
+    def queue_prefetch(self):
+        """
+        Pre-render the first page of the invoices either side of the one
+        on screen, so stepping through the list doesn't wait on get_pixmap.
+        Runs from after_idle one file at a time; fitz isn't thread-safe.
+        """
+        try:
+            idx = self.invoices.index(self.pdf_path)
+        except ValueError:
+            return
+        neighbours = [self.invoices[i] for i in (idx + 1, idx - 1) if 0 <= i < len(self.invoices)]
+        self._prefetch_paths = [
+            p for p in neighbours if self._preview_key(p, 0) not in self._preview_cache
+        ]
+        if self._prefetch_paths and self._prefetch_job is None:
+            self._prefetch_job = self.after_idle(self._prefetch_next)
+
+    def _prefetch_next(self):
+        self._prefetch_job = None
+        if not self._prefetch_paths:
+            return
+        path = self._prefetch_paths.pop(0)
+        key = self._preview_key(path, 0)
+        if key not in self._preview_cache:
+            try:
+                doc = fitz.open(path)
+                try:
+                    self._cache_preview(key, doc, 0)
+                finally:
+                    doc.close()
+            except Exception:
+                pass
+        if self._prefetch_paths:
+            self._prefetch_job = self.after_idle(self._prefetch_next)
 
     # =========================================================
     # ZOOM PDF
     # =========================================================
     def on_zoom(self, event):
+        # keep the level on the 0.1 grid so repeated steps don't drift and
+        # wheeling back lands on the same preview cache key / matrix
         if event.delta > 0:
-            self.zoom_level = min(self.zoom_level + 0.1, 6.0)
+            self.zoom_level = round(min(self.zoom_level + 0.1, 6.0), 1)
         else:
-            self.zoom_level = max(self.zoom_level - 0.1, 0.4)
-        self.render_pdf()
+            self.zoom_level = round(max(self.zoom_level - 0.1, 0.4), 1)
+        self.schedule_render(ZOOM_RENDER_DELAY_MS)
 
     # =========================================================
     # LOAD PARSED DATA (TOP ONLY)
@@ -458,8 +613,15 @@ class InvoiceSorterUI(tk.Tk):
             return
 
         try:
-            parser = __import__(self.vendor_module_name)
-            result = parser.parse_invoice(pdf_path)
+            # reuse the document already open for the preview when the
+            # parser can take one, instead of opening the PDF again
+            parse = None
+            parse_doc = getattr(self._get_parser(), "parse_invoice_doc", None)
+            doc = self.pdf_document
+            if parse_doc is not None and doc is not None and self.pdf_path == pdf_path \
+                    and not doc.is_closed:
+                parse = lambda _p: parse_doc(doc)
+            result = self._cached_parse(pdf_path, parse)
         except Exception as e:
             self.parsed_output.insert(tk.END, f"Parser error:\n{e}")
             return
@@ -528,9 +690,7 @@ class InvoiceSorterUI(tk.Tk):
             return
 
         best_index = None
-        for idx in range(self.job_list.size()):
-            text = self.job_list.get(idx)
-            key = text.lower().replace(" ", "")
+        for key, idx in self._job_keys:
             if target in key or key in target:
                 best_index = idx
                 break
@@ -555,7 +715,7 @@ class InvoiceSorterUI(tk.Tk):
 
         # Import vendor parser
         try:
-            parser = __import__(self.vendor_module_name)
+            parser = self._get_parser()
         except Exception as e:
             messagebox.showerror("Parser Error", f"Could not load parser:\n{e}")
             return
@@ -567,16 +727,22 @@ class InvoiceSorterUI(tk.Tk):
 
         for pdf_path in list(self.invoices):
             try:
-                parsed_pages = parser.parse_invoice(pdf_path)
+                doc = fitz.open(pdf_path)
+
+                # parsers that accept an open document share this one,
+                # so the PDF isn't opened twice
+                parse_doc = getattr(parser, "parse_invoice_doc", None)
+                if parse_doc is not None:
+                    parsed_pages = self._cached_parse(pdf_path, lambda _p: parse_doc(doc))
+                else:
+                    parsed_pages = self._cached_parse(pdf_path, parser.parse_invoice)
                 if not isinstance(parsed_pages, list):
                     parsed_pages = [parsed_pages]
 
-                doc = fitz.open(pdf_path)
+                whole_file = doc.page_count == 1 and len(parsed_pages) == 1
 
                 for inv in parsed_pages:
                     page_num = inv.get("page", 1) - 1
-                    new_doc = fitz.open()
-                    new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
 
                     # ---------------------------
                     # Extract fields cleanly
@@ -600,14 +766,19 @@ class InvoiceSorterUI(tk.Tk):
                     file_name = f"{vendor_clean}_{job_clean}_{date_clean}_{invoice_clean}_{total_clean}.pdf"
 
                     # Remove forbidden filename characters
-                    bad_chars = ['"', "'", ":", "?", "*", "<", ">", "|"]
-                    for ch in bad_chars:
-                        file_name = file_name.replace(ch, "")
+                    file_name = _BAD_FILE_RE.sub("", file_name)
 
                     out_path = os.path.join(processed_folder, file_name)
 
-                    new_doc.save(out_path)
-                    new_doc.close()
+                    if whole_file and page_num == 0:
+                        # the source already is this one-page invoice; copy
+                        # the bytes instead of rebuilding the PDF
+                        shutil.copyfile(pdf_path, out_path)
+                    else:
+                        new_doc = fitz.open()
+                        new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
+                        new_doc.save(out_path)
+                        new_doc.close()
                     total_created += 1
 
                 doc.close()
@@ -623,11 +794,9 @@ class InvoiceSorterUI(tk.Tk):
 
     def show_processed_folder(self, processed_folder: str):
         self.current_folder = processed_folder
-        self.invoices = [
-            os.path.join(processed_folder, f)
-            for f in os.listdir(processed_folder)
-            if f.lower().endswith(".pdf")
-        ]
+        self.invoices = list_pdfs(processed_folder)
+        # split pages may have been re-saved under names seen before
+        self._preview_cache.clear()
         # reset invoice info for processed invoices
         self.invoice_info = {
             p: {"parsed": None, "jobname": None, "staged": False}
@@ -671,8 +840,7 @@ class InvoiceSorterUI(tk.Tk):
                 messagebox.showerror("Error", "No parser configured for this vendor.")
                 return
             try:
-                parser = __import__(self.vendor_module_name)
-                result = parser.parse_invoice(inv_path)
+                result = self._cached_parse(inv_path)
                 if isinstance(result, list):
                     inv = result[0] if result else {}
                 elif isinstance(result, dict):
@@ -710,8 +878,12 @@ class InvoiceSorterUI(tk.Tk):
         """
         matches = 0
 
-        # Build normalized lookup: "hamp" → "HAMP"
-        job_lookup = {j.lower().strip(): j for j in self.jobnames}
+        job_lookup = self._job_lookup
+
+        try:
+            parse_invoice = self._get_parser().parse_invoice
+        except Exception:
+            parse_invoice = None
 
         for idx, inv_path in enumerate(self.invoices):
 
@@ -725,16 +897,17 @@ class InvoiceSorterUI(tk.Tk):
 
             # Parse invoice now if needed
             if not parsed:
+                if parse_invoice is None:
+                    continue
                 try:
-                    parser = __import__(self.vendor_module_name)
-                    result = parser.parse_invoice(inv_path)
+                    result = self._cached_parse(inv_path, parse_invoice)
                     parsed = result[0] if isinstance(result, list) else result
                     info["parsed"] = parsed
                 except Exception:
                     continue
 
             # Normalize jobname
-            jn = (parsed.get("jobname") or "").strip().lower()
+            jn = (parsed.get("jobname") or "").strip().casefold()
 
             # Exact match only (case ignored)
             if jn in job_lookup:
@@ -810,31 +983,35 @@ class InvoiceSorterUI(tk.Tk):
         # ============================================
         # DUPLICATE CHECKING HELPER (NEW FUNCTION)
         # ============================================
-        def invoice_exists_in_sheet(ws, date_str, vendor, invoice_number, total):
+        def existing_invoices(ws):
             """
-            Returns True if this invoice already exists in the sheet
-            (starting scan at row 18 downward).
+            Returns the (date, vendor, invoice number, total) rows already
+            in the sheet, as strings. Every row from 18 to the end of the
+            sheet is checked, so entries below a gap still count.
             """
-            row = 18
-            while True:
-                a = ws.cell(row=row, column=1).value  # date
-                b = ws.cell(row=row, column=2).value  # vendor
-                c = ws.cell(row=row, column=3).value  # invoice number
-                d = ws.cell(row=row, column=4).value  # total
-
-                # Hit empty row → not found
-                if a is None and b is None and c is None and d is None:
-                    return False
-
-                if str(a) == str(date_str) and str(b) == str(vendor) \
-                        and str(c) == str(invoice_number) and str(d) == str(total):
-                    return True
-
-                row += 1
+            seen = set()
+            for row in ws.iter_rows(min_row=18, max_row=ws.max_row,
+                                    max_col=4, values_only=True):
+                # Blank rows aren't entries, but there may be more below
+                if all(v is None for v in row):
+                    continue
+                seen.add(tuple(str(v) for v in row))
+            return seen
+
+        # sheet title -> [existing invoice set, next row to try for writing],
+        # built once per sheet so each staged invoice is an O(1) check
+        sheet_state = {}
+        # title -> sheet, snapshotted once; wb.sheetnames / wb[title] walk
+        # the whole sheet list on every access
+        sheet_map = {name: wb[name] for name in wb.sheetnames}
+        # sheet title -> Billing_Summary/<job>/invoices, created on first use
+        invoice_folders = {}
 
         # Process each staged invoice
         processed_count = 0
         duplicate_count = 0
+        # status lines for the parsed-output box, written in one insert
+        report = []
 
         for p in staged_paths:
             info = self.invoice_info.get(p, {})
@@ -848,8 +1025,7 @@ class InvoiceSorterUI(tk.Tk):
                 if not self.vendor_module_name:
                     continue
                 try:
-                    parser = __import__(self.vendor_module_name)
-                    result = parser.parse_invoice(p)
+                    result = self._cached_parse(p)
                     if isinstance(result, list):
                         inv = result[0] if result else {}
                     elif isinstance(result, dict):
@@ -867,26 +1043,30 @@ class InvoiceSorterUI(tk.Tk):
 
             # Get or create sheet for this jobname
             sheet_title = sanitize_sheet_title(jobname)
-            if sheet_title in wb.sheetnames:
-                ws = wb[sheet_title]
-            else:
-                ws = wb.create_sheet(title=sheet_title)
+            ws = sheet_map.get(sheet_title)
+            if ws is None:
+                ws = sheet_map[sheet_title] = wb.create_sheet(title=sheet_title)
+            state = sheet_state.get(sheet_title)
+            if state is None:
+                state = sheet_state[sheet_title] = [existing_invoices(ws), 18]
+            existing = state[0]
+            key = (str(date_str), str(vendor), str(invoice_number), str(total))
 
             # ============================================
             # VALIDATION — SKIP DUPLICATE ENTRIES
             # ============================================
-            if invoice_exists_in_sheet(ws, date_str, vendor, invoice_number, total):
+            if key in existing:
                 duplicate_count += 1
-                self.parsed_output.insert(
-                    tk.END,
-                    f"\nDuplicate skipped: Invoice {invoice_number} ({jobname})"
-                )
+                report.append(f"\nDuplicate skipped: Invoice {invoice_number} ({jobname})")
                 continue
 
-            # Find first empty row at or below row 18
-            row = 18
+            # Find first empty row at or below row 18 (rows above the last
+            # one written this run are already known to be taken)
+            row = state[1]
             while ws.cell(row=row, column=1).value not in (None, ""):
                 row += 1
+            state[1] = row + 1
+            existing.add(key)
 
             ws.cell(row=row, column=1, value=date_str)
             ws.cell(row=row, column=2, value=vendor)
@@ -894,16 +1074,20 @@ class InvoiceSorterUI(tk.Tk):
             ws.cell(row=row, column=4, value=total)
 
             # Move processed file into ROOT/Billing_Summary/<jobname>/invoices
-            job_folder_safe = sanitize_sheet_title(jobname)
-            invoices_folder = os.path.join(BILLING_SUMMARY_ROOT, job_folder_safe, "invoices")
-            safe_move(p, invoices_folder)
+            invoices_folder = invoice_folders.get(sheet_title)
+            if invoices_folder is None:
+                invoices_folder = os.path.join(BILLING_SUMMARY_ROOT, sheet_title, "invoices")
+                os.makedirs(invoices_folder, exist_ok=True)
+                invoice_folders[sheet_title] = invoices_folder
+            safe_move(p, invoices_folder, make_dirs=False)
 
             processed_count += 1
 
         # Remove default sheet if it's unused
-        if "Sheet" in wb.sheetnames and len(wb.sheetnames) > 1:
-            std = wb["Sheet"]
-            if all(std.cell(row=r, column=c).value is None for r in range(1, 10) for c in range(1, 5)):
+        if "Sheet" in sheet_map and len(sheet_map) > 1:
+            std = sheet_map["Sheet"]
+            rows = std.iter_rows(min_row=1, max_row=9, max_col=4, values_only=True)
+            if not any(v is not None for row in rows for v in row):
                 wb.remove(std)
 
         wb.save(excel_path)
@@ -919,15 +1103,10 @@ class InvoiceSorterUI(tk.Tk):
                     self.invoice_info.pop(path, None)
 
         # Report results
-        self.parsed_output.insert(
-            tk.END,
-            f"\n\n{processed_count} invoice(s) added to summary."
-        )
+        report.append(f"\n\n{processed_count} invoice(s) added to summary.")
         if duplicate_count > 0:
-            self.parsed_output.insert(
-                tk.END,
-                f"\n{duplicate_count} duplicate(s) skipped."
-            )
+            report.append(f"\n{duplicate_count} duplicate(s) skipped.")
+        self.parsed_output.insert(tk.END, "".join(report))
 
         messagebox.showinfo(
             "Success",
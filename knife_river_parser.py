@@ -1,16 +1,30 @@
 import fitz  # PyMuPDF
 import re
+from parse_cache import ParseCache
+
+
+# Text extraction flags: keep whitespace and clip to the page, but let
+# MuPDF expand ligatures and skip the unknown-glyph CID fallback
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# Patterns compiled once at import, not per page
+# A whole line of 6+ digits, searched over the page text in one call
+_INV_LINE_RE = re.compile(r"(?m)^\s*(\d{6,})\s*$")
+_DATE_RE = re.compile(r"\b\d{2}/\d{2}/\d{2}\b")
+_MONEY_RE = re.compile(r"\b\d{1,3}(?:,\d{3})*\.\d{2}\b")
+
+# Lines above "ORIGINAL" that are labels, not the job name
+_JOB_BAD_WORDS = frozenset({"INVOICE", "TICKET", "PAYABLE COPY", "SUBTOTAL", "TOTAL"})
 
 
 # ============================================================
 # LOW-LEVEL: EXTRACT TEXT FROM A SINGLE PAGE
 # ============================================================
-def _extract_page_text(doc, page_index: int) -> str:
+def _extract_page_text(page) -> str:
     """
     Return raw text for a single page, as a string.
     """
-    page = doc.load_page(page_index)
-    txt = page.get_text("text")  # pure text mode
+    txt = page.get_text("text", flags=_TEXT_FLAGS, sort=False)  # pure text mode
     return txt.replace("\x00", "").strip()
 
 
@@ -22,7 +36,7 @@ def _parse_knife_river_page(raw_text: str, page_number: int) -> dict:
     Given the raw text for ONE page of a Knife River invoice,
     extract: vendor, invoice_number, jobname, date, total, raw_text, page.
     """
-    lines = [ln.strip() for ln in raw_text.splitlines() if ln.strip()]
+    lines = [s for ln in raw_text.splitlines() if (s := ln.strip())]
 
     # -----------------------------
     # Vendor is always Knife River
@@ -33,22 +47,15 @@ def _parse_knife_river_page(raw_text: str, page_number: int) -> dict:
     # Invoice Number:
     # first line that is 6+ digits only (e.g. 968457, 940775)
     # -----------------------------
-    invoice_number = ""
-    for ln in lines:
-        if re.fullmatch(r"\d{6,}", ln):
-            invoice_number = ln
-            break
+    m = _INV_LINE_RE.search(raw_text)
+    invoice_number = m.group(1) if m else ""
 
     # -----------------------------
     # Date:
     # first MM/DD/YY pattern, e.g. 09/08/25
     # -----------------------------
-    date = ""
-    for ln in lines:
-        m = re.search(r"\b\d{2}/\d{2}/\d{2}\b", ln)
-        if m:
-            date = m.group(0)
-            break
+    m = _DATE_RE.search(raw_text)
+    date = m.group(0) if m else ""
 
     # ============================================================
     # TOTAL (PATCHED — CORRECTLY CAPTURE NUMBERS WITH COMMAS)
@@ -59,7 +66,7 @@ def _parse_knife_river_page(raw_text: str, page_number: int) -> dict:
     #   440.70
     #   1,025.28
     #   12,345.67
-    total_matches = re.findall(r"\b\d{1,3}(?:,\d{3})*\.\d{2}\b", raw_text)
+    total_matches = _MONEY_RE.findall(raw_text)
 
     if total_matches:
         # Take the LAST money value on the page (Knife River puts total last)
@@ -71,18 +78,17 @@ def _parse_knife_river_page(raw_text: str, page_number: int) -> dict:
     # ============================================================
     jobname = ""
     for idx, ln in enumerate(lines):
-        if ln.upper() == "ORIGINAL":
+        # length check first so only 8-character lines pay for upper()
+        if len(ln) == 8 and ln.upper() == "ORIGINAL":
             candidate = lines[idx - 1] if idx - 1 >= 0 else ""
             candidate2 = lines[idx - 2] if idx - 2 >= 0 else ""
 
-            bad_words = {"INVOICE", "TICKET", "PAYABLE COPY", "SUBTOTAL", "TOTAL"}
-
             cand_up = candidate.upper()
             cand2_up = candidate2.upper()
 
-            if candidate and cand_up not in bad_words:
+            if candidate and cand_up not in _JOB_BAD_WORDS:
                 jobname = candidate
-            elif candidate2 and cand2_up not in bad_words:
+            elif candidate2 and cand2_up not in _JOB_BAD_WORDS:
                 jobname = candidate2
 
             break
@@ -112,22 +118,32 @@ def parse_invoice(pdf_path: str):
     Parse a Knife River PDF that may contain multiple invoices
     (one invoice per page).
     """
-    try:
-        doc = fitz.open(pdf_path)
-    except Exception as e:
-        raise RuntimeError(f"Could not open PDF '{pdf_path}': {e}")
+    return _PARSE_CACHE.parse_path(pdf_path)
 
-    results = []
 
-    for page_index in range(len(doc)):
-        raw_text = _extract_page_text(doc, page_index)
+def parse_invoice_doc(doc):
+    """
+    Same as parse_invoice() for a fitz.Document the caller already has
+    open (and closes), e.g. the UI's preview document.
+    """
+    return _PARSE_CACHE.parse_open_doc(doc)
+
+
+def _parse_doc(doc):
+    """Parse every page of an open document, one page at a time."""
+    results = []
+    # iterate the document itself rather than load_page() per index
+    for page_index, page in enumerate(doc):
+        raw_text = _extract_page_text(page)
         parsed = _parse_knife_river_page(raw_text, page_index + 1)
         results.append(parsed)
-
-    doc.close()
     return results
 
 
+# Parsed results keyed by (path, mtime_ns, size); see parse_cache.py
+_PARSE_CACHE = ParseCache(_parse_doc)
+
+
 # ============================================================
 # OPTIONAL: CONSOLE OUTPUT WHEN RUN DIRECTLY
 # ============================================================
@@ -1,29 +1,50 @@
 import fitz  # PyMuPDF
 import re
 import os
+from parse_cache import ParseCache
+
+
+# Text extraction flags: keep whitespace and clip to the page, but let
+# MuPDF expand ligatures and skip the unknown-glyph CID fallback
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# Patterns compiled once at import, not per page
+_INV_RE = re.compile(r"\d{6,7}")
+_INV_ANY_RE = re.compile(r"\b(\d{6,7})\b")
+_DATE_RE = re.compile(r"\b\d{1,2}/\d{1,2}/\d{2}\b")
+_MONEY_RE = re.compile(r"\$(\d{1,3}(?:,\d{3})*\.\d{2})")
+_FALLBACK_JOB_RE = re.compile(r"[A-Z0-9 ]{3,30}")
+_FILENAME_BAD_RE = re.compile(r'[\\/:*?"<>|]')
+
+# Words that rule a line out as the job name
+_WEIGHT_KEYWORDS = ("GROSS", "TARE", "NET", "WEIGHT", "SCALE", "INBOUND")
+_FALLBACK_BAD_WORDS = (
+    "PAYMENT", "GRANT", "CREEK", "EXCAVATING", "MISSOULA",
+    "LANDFILL", "GROSS", "TARE", "NET", "WEIGHT", "INVOICE",
+    "INBOUND", "SCALE", "SIGNATURE"
+)
 
 
 # ============================================================
 # LOW-LEVEL: EXTRACT TEXT FROM A SINGLE PAGE
 # ============================================================
-def _extract_page_text(doc, page_index: int) -> str:
+def _extract_page_text(page) -> str:
     """
     Return raw text for a single page.
     """
-    page = doc.load_page(page_index)
-    txt = page.get_text("text")
+    txt = page.get_text("text", flags=_TEXT_FLAGS, sort=False)
     return txt.replace("\x00", "").strip()
 
 
 # ============================================================
 # MISS0ULA LANDFILL — INVOICE NUMBER EXTRACTION (FIXED)
 # ============================================================
-def _extract_missoula_invoice_number(raw_text: str) -> str:
+def _extract_missoula_invoice_number(lines, raw_text: str) -> str:
     """
     Improved Missoula Landfill invoice number extractor.
     Always returns the correct 6–7 digit invoice number.
+    `lines` are the page's stripped, non-empty lines.
     """
-    lines = [ln.strip() for ln in raw_text.splitlines() if ln.strip()]
 
     # ---------------------------------------------------------
     # 1) Most reliable spot: lines immediately after SIGNATURE
@@ -32,36 +53,43 @@ def _extract_missoula_invoice_number(raw_text: str) -> str:
         if "SIGNATURE" in ln.upper():
             for j in range(i + 1, min(i + 5, len(lines))):
                 # A pure 6–7 digit number
-                if re.fullmatch(r"\d{6,7}", lines[j]):
+                if _INV_RE.fullmatch(lines[j]):
                     return lines[j]
 
     # ---------------------------------------------------------
     # 2) Standalone 6–7 digit line (skip "01", weight numbers)
     # ---------------------------------------------------------
     for ln in lines:
-        if re.fullmatch(r"\d{6,7}", ln):
+        if _INV_RE.fullmatch(ln):
             return ln
 
     # ---------------------------------------------------------
     # 3) Fallback: any 6–7 digit number anywhere
     # ---------------------------------------------------------
-    m = re.search(r"\b(\d{6,7})\b", raw_text)
+    m = _INV_ANY_RE.search(raw_text)
     return m.group(1) if m else ""
 
 
 # ============================================================
 # EXTRACT DATE
 # ============================================================
-def _extract_missoula_date(lines) -> str:
+def _scan_missoula_dates(lines):
     """
-    First MM/DD/YY style date.
+    One pass for both date consumers: returns the first MM/DD/YY style
+    date and the indices of the first two lines that contain one
+    (all the jobname logic needs), stopping as soon as it has them.
     """
-    date_pattern = re.compile(r"\b\d{1,2}/\d{1,2}/\d{2}\b")
-    for ln in lines:
-        m = date_pattern.search(ln)
+    first = ""
+    date_indices = []
+    for idx, ln in enumerate(lines):
+        m = _DATE_RE.search(ln)
         if m:
-            return m.group(0)
-    return ""
+            if not first:
+                first = m.group(0)
+            date_indices.append(idx)
+            if len(date_indices) == 2:
+                break
+    return first, date_indices
 
 
 # ============================================================
@@ -71,40 +99,30 @@ def _extract_missoula_total(raw_text: str) -> str:
     """
     Choose largest non-zero $XXX.XX.
     """
-    money_matches = re.findall(r"\$(\d{1,3}(?:,\d{3})*\.\d{2})", raw_text)
-    if not money_matches:
-        return ""
-
-    parsed = [(float(x.replace(",", "")), x) for x in money_matches]
-    nonzero = [p for p in parsed if p[0] > 0]
+    # amounts are never negative, so the largest one is non-zero whenever
+    # any is; strict ">" keeps the first of equal values
+    best = None
+    best_val = -1.0
+    for m in _MONEY_RE.finditer(raw_text):
+        digits = m.group(1).replace(",", "")
+        val = float(digits)
+        if val > best_val:
+            best_val, best = val, digits
 
-    if nonzero:
-        _, best_str = max(nonzero, key=lambda t: t[0])
-    else:
-        _, best_str = max(parsed, key=lambda t: t[0])
-
-    return best_str.replace(",", "")
+    return best if best is not None else ""
 
 
 # ============================================================
 # JOBNAME LOGIC
 # ============================================================
-def _extract_missoula_jobname(lines) -> str:
+def _extract_missoula_jobname(lines, date_indices) -> str:
     """
     Job name appears after the 2nd date.
     """
-    date_pattern = re.compile(r"\b\d{1,2}/\d{1,2}/\d{2}\b")
-    date_indices = []
-
-    for idx, ln in enumerate(lines):
-        if date_pattern.search(ln):
-            date_indices.append(idx)
-
     if len(date_indices) < 2:
         return _fallback_jobname(lines)
 
     start_idx = date_indices[1] + 1
-    weight_keywords = {"GROSS", "TARE", "NET", "WEIGHT", "SCALE", "INBOUND"}
 
     for i in range(start_idx, min(start_idx + 6, len(lines))):
         ln = lines[i].strip()
@@ -114,7 +132,7 @@ def _extract_missoula_jobname(lines) -> str:
             continue
         if ln.isdigit():  # skip scale numbers like "01"
             continue
-        if any(w in up for w in weight_keywords):
+        if any(w in up for w in _WEIGHT_KEYWORDS):
             continue
 
         return ln
@@ -127,14 +145,9 @@ def _fallback_jobname(lines):
     Simple uppercase jobname fallback.
     """
     for ln in lines:
-        if re.fullmatch(r"[A-Z0-9 ]{3,30}", ln):
+        if _FALLBACK_JOB_RE.fullmatch(ln):
             up = ln.upper()
-            bad = [
-                "PAYMENT", "GRANT", "CREEK", "EXCAVATING", "MISSOULA",
-                "LANDFILL", "GROSS", "TARE", "NET", "WEIGHT", "INVOICE",
-                "INBOUND", "SCALE", "SIGNATURE"
-            ]
-            if not any(b in up for b in bad):
+            if not any(b in up for b in _FALLBACK_BAD_WORDS):
                 return ln
     return ""
 
@@ -143,13 +156,13 @@ def _fallback_jobname(lines):
 # CORE PARSER FOR 1 PAGE
 # ============================================================
 def _parse_missoula_landfill_page(raw_text: str, page_number: int) -> dict:
-    lines = [ln.strip() for ln in raw_text.splitlines() if ln.strip()]
+    lines = [s for ln in raw_text.splitlines() if (s := ln.strip())]
 
     vendor = "Missoula Landfill"
-    invoice_number = _extract_missoula_invoice_number(raw_text)
-    date = _extract_missoula_date(lines)
+    invoice_number = _extract_missoula_invoice_number(lines, raw_text)
+    date, date_indices = _scan_missoula_dates(lines)
     total = _extract_missoula_total(raw_text)
-    jobname = _extract_missoula_jobname(lines)
+    jobname = _extract_missoula_jobname(lines, date_indices)
 
     return {
         "vendor": vendor,
@@ -166,21 +179,32 @@ def _parse_missoula_landfill_page(raw_text: str, page_number: int) -> dict:
 # PUBLIC API – PARSE ENTIRE PDF
 # ============================================================
 def parse_invoice(pdf_path: str):
-    try:
-        doc = fitz.open(pdf_path)
-    except Exception as e:
-        raise RuntimeError(f"Could not open PDF '{pdf_path}': {e}")
+    return _PARSE_CACHE.parse_path(pdf_path)
+
+
+def parse_invoice_doc(doc):
+    """
+    Same as parse_invoice() for a fitz.Document the caller already has
+    open (and closes), e.g. the UI's preview document.
+    """
+    return _PARSE_CACHE.parse_open_doc(doc)
+
 
+def _parse_doc(doc):
+    """Parse every page of an open document, one page at a time."""
     results = []
-    for page_index in range(len(doc)):
-        raw_text = _extract_page_text(doc, page_index)
+    # iterate the document itself rather than load_page() per index
+    for page_index, page in enumerate(doc):
+        raw_text = _extract_page_text(page)
         parsed = _parse_missoula_landfill_page(raw_text, page_index + 1)
         results.append(parsed)
-
-    doc.close()
     return results
 
 
+# Parsed results keyed by (path, mtime_ns, size); see parse_cache.py
+_PARSE_CACHE = ParseCache(_parse_doc)
+
+
 # ============================================================
 # CONSOLE PREVIEW BUILDER
 # ============================================================
@@ -212,7 +236,7 @@ def _clean_for_filename(value: str) -> str:
     v = value.strip()
     v = v.replace("/", "-")
     v = v.replace(" ", "")
-    v = re.sub(r'[\\/:*?"<>|]', "", v)
+    v = _FILENAME_BAD_RE.sub("", v)
     return v
 
 
@@ -241,11 +265,17 @@ def build_output_filename(inv: dict) -> str:
 # SAVE SPLIT PAGES INTO PROCESSED/
 # ============================================================
 def save_split_invoices(pdf_path: str) -> int:
-    parsed_pages = parse_invoice(pdf_path)
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        raise RuntimeError(f"Could not open PDF '{pdf_path}': {e}")
+
+    # parse and split from the same open document
+    parsed_pages = parse_invoice_doc(doc)
     if not parsed_pages:
+        doc.close()
         return 0
 
-    doc = fitz.open(pdf_path)
     folder = os.path.dirname(pdf_path)
     processed_folder = os.path.join(folder, "processed")
     os.makedirs(processed_folder, exist_ok=True)
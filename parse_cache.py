@@ -0,0 +1,90 @@
+import os
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+
+# Parsed results kept per parser, oldest out first
+PARSE_CACHE_SIZE = 256
+
+# Empty MuPDF's font/image store after each parsed file. The sorter UI
+# turns this off, since its preview document stays open and would lose
+# its cached fonts/images on every parse.
+SHRINK_STORE = True
+
+
+def close_pdf(doc):
+    """
+    Close doc and, with SHRINK_STORE on, empty MuPDF's store: it keeps
+    fonts/images cached across documents, so long batches would keep growing.
+    """
+    doc.close()
+    if SHRINK_STORE:
+        fitz.TOOLS.store_shrink(100)
+
+
+def _cache_key(pdf_path):
+    st = os.stat(pdf_path)
+    return (os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size)
+
+
+class ParseCache:
+    """
+    Parsed results of one vendor parser, keyed by (path, mtime_ns, size),
+    so the UI re-selecting or staging an invoice doesn't re-extract an
+    unchanged PDF.
+
+    parse_doc(doc) is the parser's own walk over an open fitz.Document,
+    returning one dict per invoice.
+    """
+
+    def __init__(self, parse_doc, size=PARSE_CACHE_SIZE):
+        self._parse_doc = parse_doc
+        self._size = size
+        self._results = OrderedDict()
+
+    def _get(self, key):
+        results = self._results.get(key)
+        if results is not None:
+            self._results.move_to_end(key)
+        return results
+
+    def _put(self, key, results):
+        self._results[key] = results
+        if len(self._results) > self._size:
+            self._results.popitem(last=False)
+
+    def parse_path(self, pdf_path):
+        """Open, parse and close pdf_path, unless it is already cached."""
+        key = _cache_key(pdf_path) if os.path.isfile(pdf_path) else None
+        results = self._get(key) if key else None
+        if results is None:
+            try:
+                doc = fitz.open(pdf_path)
+            except Exception as e:
+                raise RuntimeError(f"Could not open PDF '{pdf_path}': {e}")
+
+            try:
+                results = self._parse_doc(doc)
+            finally:
+                close_pdf(doc)
+            if key:
+                self._put(key, results)
+
+        # hand out copies so callers can edit them without touching the cache
+        return [dict(res) for res in results]
+
+    def parse_open_doc(self, doc):
+        """
+        Same as parse_path() for a fitz.Document the caller already has
+        open (and closes), so the PDF is only parsed by MuPDF once.
+        """
+        pdf_path = doc.name if doc.name and os.path.isfile(doc.name) else None
+        key = _cache_key(pdf_path) if pdf_path else None
+        results = self._get(key) if key else None
+        if results is None:
+            results = self._parse_doc(doc)
+            if key:
+                self._put(key, results)
+
+        return [dict(res) for res in results]
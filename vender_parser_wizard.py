@@ -1,20 +1,26 @@
 import os
-import fitz  # PyMuPDF
 import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+# Runs of anything that can't appear in a parser module name
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+
 # ------------------------------------------------------------
 # Utility: extract text from PDF (page by page)
 # ------------------------------------------------------------
 def extract_pdf_text(pdf_path):
+    # PyMuPDF is imported on first use so the wizard window opens without
+    # waiting for its native libraries to load
+    import fitz  # PyMuPDF
+
+    # same default text flags as the generated parser, so Test Rules sees
+    # exactly the text the saved parser will
     doc = fitz.open(pdf_path)
-    pages = []
-    for i, page in enumerate(doc):
-        text = page.get_text("text")
-        pages.append((i + 1, text))
-    doc.close()
-    return pages
+    try:
+        return [(i + 1, page.get_text("text")) for i, page in enumerate(doc)]
+    finally:
+        doc.close()
 
 
 class TemplateWizard(tk.Tk):
@@ -40,7 +46,9 @@ class TemplateWizard(tk.Tk):
         # Selected PDF info
         self.pdf_path = None
         self.pages = []         # list of (page_num, text)
+        self._pdf_mtime = None  # mtime of pdf_path when self.pages was read
         self.current_page_idx = 0
+        self._current_page_text = ""  # text shown in self.text
 
         # Field configs: each has {"value", "anchor", "pattern"}
         self.fields = {
@@ -199,21 +207,25 @@ class TemplateWizard(tk.Tk):
         if not path:
             return
         try:
+            mtime = os.path.getmtime(path)
             self.pages = extract_pdf_text(path)
         except Exception as e:
             messagebox.showerror("Error", f"Could not read PDF:\n{e}")
             return
 
         self.pdf_path = path
+        self._pdf_mtime = mtime
         self.current_page_idx = 0
         self.show_current_page()
 
     def show_current_page(self):
         self.text.delete("1.0", tk.END)
         if not self.pages:
+            self._current_page_text = ""
             self.page_label.config(text="Page: - / -")
             return
         page_num, text = self.pages[self.current_page_idx]
+        self._current_page_text = text
         self.text.insert("1.0", text)
         self.page_label.config(
             text=f"Page: {self.current_page_idx + 1} / {len(self.pages)}"
@@ -248,8 +260,9 @@ class TemplateWizard(tk.Tk):
             messagebox.showwarning("Empty selection", "Please select some text (not just spaces).")
             return
 
-        # Grab full page text
-        full_text = self.text.get("1.0", "end-1c")
+        # Full page text, kept from show_current_page rather than pulled
+        # back out of the Text widget on every click
+        full_text = self._current_page_text
 
         # Find position of selected text in full_text
         # (If it appears multiple times, we'll use the first occurrence.)
@@ -277,7 +290,7 @@ class TemplateWizard(tk.Tk):
           - Look ~40 characters to the left of the value.
           - Use the last line before the value as anchor.
           - Trim to last ~25 characters so it's short.
-          - Build pattern:  ANCHOR + r"\\s*([^\\n]+)"
+          - Build pattern:  ANCHOR + r"\\s*(\\S[^\\n]*)"
         """
         window = 40
         start = max(0, value_pos - window)
@@ -296,8 +309,10 @@ class TemplateWizard(tk.Tk):
         if not anchor:
             pattern = re.escape(value)
         else:
-            # Escape special regex chars in anchor, then capture up to newline
-            pattern = re.escape(anchor) + r"\s*([^\n]+)"
+            # Escape special regex chars in anchor, then capture up to newline.
+            # The capture starts on a non-space so it cannot trade characters
+            # back and forth with the \s* run in front of it.
+            pattern = re.escape(anchor) + r"\s*(\S[^\n]*)"
 
         return anchor, pattern
 
@@ -320,18 +335,27 @@ class TemplateWizard(tk.Tk):
     # --------------------------------------------------------
     def generate_parser_code(self):
         vendor_name_for_file = self.vendor_name_entry.get().strip() or "vendor"
-        # Safe module name
-        safe_vendor = "".join(ch if ch.isalnum() else "_" for ch in vendor_name_for_file.lower())
-        if not safe_vendor:
-            safe_vendor = "vendor"
+        # Safe module name, cleaned the same way the sorter UI derives the
+        # module it imports for a vendor folder
+        safe_vendor = _NON_ALNUM_RE.sub("_", vendor_name_for_file.lower()).strip("_") or "vendor"
 
         vendor_title = vendor_name_for_file or "Vendor Name"
 
+        # Field patterns become module constants in the generated parser,
+        # compiled once at import instead of on every page
+        pattern_consts = "".join(
+            f'_{key.upper()}_RE = re.compile(r"{info["pattern"]}", re.MULTILINE)\n'
+            for key, info in self.fields.items()
+            if info["pattern"]
+        )
+        if pattern_consts:
+            pattern_consts = "\n# Wizard patterns, compiled once at import\n" + pattern_consts
+
         # Build helper detect_* functions with patterns
         def pattern_for(field_key, default_comment):
             info = self.fields[field_key]
             if info["pattern"]:
-                return f'    m = re.search(r"{info["pattern"]}", text, re.MULTILINE)\n' \
+                return f'    m = _{field_key.upper()}_RE.search(text)\n' \
                        f'    if m:\n        return m.group(1).strip()\n' \
                        f'    return ""\n'
             else:
@@ -339,76 +363,67 @@ class TemplateWizard(tk.Tk):
                        f'    # {default_comment}\n' \
                        f'    return ""\n'
 
-        code = f'''# Auto-generated parser for {vendor_title}
+        parts = [f'''# Auto-generated parser for {vendor_title}
 # Generated by TemplateWizard
 
 import fitz  # PyMuPDF
 import re
+{pattern_consts}
 
-def extract_pdf_text(pdf_path):
+def iter_invoices(pdf_path):
+    """Yield one invoice dict per page, parsing each page as it is read."""
     doc = fitz.open(pdf_path)
-    pages = []
-    for i, page in enumerate(doc):
-        text = page.get_text("text")
-        pages.append((i + 1, text))
-    doc.close()
-    return pages
+    try:
+        for i, page in enumerate(doc):
+            text = page.get_text("text")
+            yield {{
+                "vendor": detect_vendor_name(text),
+                "invoice_number": detect_invoice_number(text),
+                "jobname": detect_jobname(text),
+                "date": detect_invoice_date(text),
+                "total": detect_invoice_total(text),
+                "work_number": detect_work_number(text),
+                "page": i + 1,
+            }}
+    finally:
+        doc.close()
 
 
 def parse_invoice(pdf_path):
-    pages = extract_pdf_text(pdf_path)
-    results = []
-
-    for page_num, text in pages:
-        inv = {{
-            "vendor": detect_vendor_name(text),
-            "invoice_number": detect_invoice_number(text),
-            "jobname": detect_jobname(text),
-            "date": detect_invoice_date(text),
-            "total": detect_invoice_total(text),
-            "work_number": detect_work_number(text),
-            "page": page_num,
-        }}
-        results.append(inv)
-
+    results = list(iter_invoices(pdf_path))
     return results[0] if len(results) == 1 else results
 
 
 def detect_vendor_name(text):
-'''
+''']
         # Vendor: for now, if user selected a specific literal vendor line,
         # we can just return that literal as default if we don't find a pattern.
         vend_info = self.fields["vendor"]
         if vend_info["pattern"]:
-            code += f'    m = re.search(r"{vend_info["pattern"]}", text, re.MULTILINE)\n' \
-                    f'    if m:\n        return m.group(1).strip()\n' \
-                    f'    return "{vend_info["value"]}"\n\n'
+            parts.append(f'    m = _VENDOR_RE.search(text)\n'
+                         f'    if m:\n        return m.group(1).strip()\n'
+                         f'    return "{vend_info["value"]}"\n\n')
         else:
-            code += f'    # TODO: pattern not set via wizard for vendor\n' \
-                    f'    # Returning literal from wizard as fallback.\n' \
-                    f'    return "{vend_info["value"]}"\n\n'
+            parts.append(f'    # TODO: pattern not set via wizard for vendor\n'
+                         f'    # Returning literal from wizard as fallback.\n'
+                         f'    return "{vend_info["value"]}"\n\n')
 
-        code += '''def detect_invoice_number(text):
-'''
-        code += pattern_for("invoice_num", "Example: look for 'Invoice # 12345'")
+        parts.append("def detect_invoice_number(text):\n")
+        parts.append(pattern_for("invoice_num", "Example: look for 'Invoice # 12345'"))
 
-        code += '''def detect_invoice_date(text):
-'''
-        code += pattern_for("date", "Example: capture date near label like 'Date:'")
+        parts.append("def detect_invoice_date(text):\n")
+        parts.append(pattern_for("date", "Example: capture date near label like 'Date:'"))
 
-        code += '''def detect_invoice_total(text):
-'''
-        code += pattern_for("total", "Example: capture total near 'Total' or 'Amount Due'")
+        parts.append("def detect_invoice_total(text):\n")
+        parts.append(pattern_for("total", "Example: capture total near 'Total' or 'Amount Due'"))
 
-        code += '''def detect_jobname(text):
-'''
-        code += pattern_for("jobname", "Example: capture job description near 'Job' or 'Project'")
+        parts.append("def detect_jobname(text):\n")
+        parts.append(pattern_for("jobname", "Example: capture job description near 'Job' or 'Project'"))
 
-        code += '''def detect_work_number(text):
-'''
-        code += pattern_for("work_number", "Optional: work order number if present")
+        parts.append("def detect_work_number(text):\n")
+        parts.append(pattern_for("work_number", "Optional: work order number if present"))
 
-        return safe_vendor + "_parser.py", code
+        return safe_vendor + "_parser.py", "".join(parts)
 
     # --------------------------------------------------------
     # Preview parser code in the UI
@@ -427,24 +442,41 @@ def detect_vendor_name(text):
             self.test_output.insert("1.0", "No PDF loaded.")
             return
 
-        # Reuse the same logic as generated parser, but inline here
+        # Reuse the same logic as generated parser, but inline here.
+        # The text from load_pdf is reused unless the file changed since.
         try:
-            pages = extract_pdf_text(self.pdf_path)
+            mtime = os.path.getmtime(self.pdf_path)
+            if mtime != self._pdf_mtime:
+                self.pages = extract_pdf_text(self.pdf_path)
+                self._pdf_mtime = mtime
+                self.current_page_idx = min(self.current_page_idx, max(len(self.pages) - 1, 0))
+                self.show_current_page()
         except Exception as e:
             self.test_output.insert("1.0", f"Error reading PDF:\n{e}")
             return
+        pages = self.pages
 
-        def apply_pattern(field_key, text):
-            info = self.fields[field_key]
+        # Compile each field's pattern once, not once per page
+        compiled = {}
+        for key, info in self.fields.items():
             pat = info["pattern"]
             if not pat:
-                return ""
+                compiled[key] = None
+                continue
             try:
-                m = re.search(pat, text, re.MULTILINE)
-                if m:
-                    return m.group(1).strip()
+                compiled[key] = re.compile(pat, re.MULTILINE)
             except re.error as e:
-                return f"[regex error: {e}]"
+                compiled[key] = f"[regex error: {e}]"
+
+        def apply_pattern(field_key, text):
+            p = compiled[field_key]
+            if p is None:
+                return ""
+            if isinstance(p, str):
+                return p
+            m = p.search(text)
+            if m:
+                return m.group(1).strip()
             return ""
 
         results = []
@@ -4,24 +4,26 @@ import importlib
 
 VENDOR_PARSER_FOLDER = "vendor_parsers"
 
+# vendor name -> parse function, filled by get_vendor_parser
+_PARSER_CACHE = {}
+
 
 def discover_vendors():
     """
     Scans vendor_parsers/ for files like:  knife_river_parser.py
     Returns vendor names: ['Knife River']
     """
-    vendors = []
-
     if not os.path.exists(VENDOR_PARSER_FOLDER):
-        return vendors
-
-    for filename in os.listdir(VENDOR_PARSER_FOLDER):
-        if filename.endswith("_parser.py"):
-            vendor_raw = filename.replace("_parser.py", "")
-            vendor_name = vendor_raw.replace("_", " ").title()
-            vendors.append(vendor_name)
+        return []
 
-    return vendors
+    # scandir's is_file() uses the type from the directory listing, so
+    # there is no extra stat per entry
+    with os.scandir(VENDOR_PARSER_FOLDER) as it:
+        return [
+            entry.name[:-len("_parser.py")].replace("_", " ").title()
+            for entry in it
+            if entry.name.endswith("_parser.py") and entry.is_file()
+        ]
 
 
 def get_vendor_parser(vendor_name):
@@ -29,6 +31,9 @@ def get_vendor_parser(vendor_name):
     Dynamically imports and returns the correct parser function
     for the selected vendor.
     """
+    fn = _PARSER_CACHE.get(vendor_name)
+    if fn is not None:
+        return fn
 
     # Convert "Knife River" → "knife_river"
     vendor_raw = vendor_name.lower().replace(" ", "_")
@@ -47,4 +52,5 @@ def get_vendor_parser(vendor_name):
             f"Parser module '{module_name}' has no function '{function_name}'"
         )
 
-    return getattr(module, function_name)
+    fn = _PARSER_CACHE[vendor_name] = getattr(module, function_name)
+    return fn
@@ -1,19 +1,32 @@
 import re
+from collections import Counter
 import fitz  # PyMuPDF
 
 PDF_PATH = r"C:\Python\Sample_PDFs\Knife River\KR 2 pages.pdf"
 
+# Patterns compiled once at import, not per page
+_DATE_RE = re.compile(r"\b\d{2}/\d{2}/\d{2}\b")
+_AMOUNT_RE = re.compile(r"\d[\d,]*\.\d{2}")
 
-def extract_pages(pdf_path):
-    """Return a list of text blocks, one per page."""
+
+def iter_pages(pdf_path):
+    """Yield the text of each page in turn, one page in memory at a time."""
     doc = fitz.open(pdf_path)
-    return [page.get_text("text") for page in doc]
+    try:
+        for page in doc:
+            yield page.get_text("text")
+    finally:
+        doc.close()
+
+
+def _tokenize(text):
+    """Stripped, non-empty lines of one page (shared by the detectors)."""
+    return [s for l in text.splitlines() if (s := l.strip())]
 
 
-def get_job_name(text):
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+def get_job_name(lines):
     for i, line in enumerate(lines):
-        if line.upper() == "ORIGINAL" and i > 0:
+        if len(line) == 8 and line.upper() == "ORIGINAL" and i > 0:
             prev = lines[i - 1]
             if not prev.isdigit():
                 return prev
@@ -22,7 +35,7 @@ def get_job_name(text):
 
 def get_invoice_date(text):
     # First MM/DD/YY on page
-    m = re.search(r"\b\d{2}/\d{2}/\d{2}\b", text)
+    m = _DATE_RE.search(text)
     return m.group() if m else None
 
 
@@ -30,32 +43,26 @@ def get_vendor_name(_text):
     return "Knife River"
 
 
-def get_total(text):
+def get_total(lines):
     """Locate TOTAL on the current page only."""
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-
-    total_index = None
     for i, line in enumerate(lines):
-        if line.strip().upper() == "TOTAL":
-            total_index = i
+        # length check first so only 5-character lines pay for upper()
+        if len(line) == 5 and line.upper() == "TOTAL":
             break
-
-    if total_index is None:
+    else:
         return None
 
-    # Numbers after TOTAL on THIS page
-    amounts = []
-    for line in lines[total_index + 1:]:
-        matches = re.findall(r"\d[\d,]*\.\d{2}", line)
-        for m in matches:
-            amounts.append(float(m.replace(",", "")))
+    # Numbers after TOTAL on THIS page, found by one findall over the
+    # rest of the page (amounts never span a line break)
+    tail = "\n".join(lines[i + 1:])
+    amounts = [float(m.replace(",", "")) for m in _AMOUNT_RE.findall(tail)]
 
     if not amounts:
         return None
 
-    # Totals often repeat 2–3 times
-    for amt in amounts:
-        if amounts.count(amt) >= 2:
+    # Totals often repeat 2–3 times; Counter keeps first-seen order
+    for amt, n in Counter(amounts).items():
+        if n >= 2:
             return amt
 
     return max(amounts)
@@ -68,14 +75,13 @@ if __name__ == "__main__":
     print(f"Reading PDF: {PDF_PATH}")
     print("--------------------------------------------------\n")
 
-    pages = extract_pages(PDF_PATH)
-
     invoice_number = 1
-    for text in pages:
-        job = get_job_name(text)
+    for text in iter_pages(PDF_PATH):
+        lines = _tokenize(text)
+        job = get_job_name(lines)
         date = get_invoice_date(text)
         vendor = get_vendor_name(text)
-        total = get_total(text)
+        total = get_total(lines)
 
         print(f"INVOICE #{invoice_number}")
         print("--------------------------------------------------")